@@ -0,0 +1,105 @@
+"""JWT authentication without a ``users`` query on every request.
+
+Each process keeps the fields permissions and views read (``AUTH_FIELDS``)
+in a small LRU, for ``AUTH_USER_CACHE_TTL`` seconds. Entries are tagged
+with a per-user version stored in the shared cache: ``invalidate_user``
+replaces it, so a deactivation or role change made by any worker is seen
+by all of them on their next request, at the cost of one cache read.
+
+``request.user`` is a ``User`` loaded with only ``AUTH_FIELDS``; other
+fields are fetched from the database if accessed.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts import revocation
+from accounts.models import User
+
+AUTH_FIELDS = ('id', 'role', 'is_active', 'nom', 'tokens_revoked_before')
+# ``Model.from_db`` expects the values in field declaration order.
+_COLUMNS = tuple(f.attname for f in User._meta.concrete_fields if f.attname in AUTH_FIELDS)
+
+_lock = threading.Lock()
+_users = OrderedDict()  # user id -> (version, expires, values)
+
+
+def _version_key(user_id):
+    return f'caf:auth:{user_id}'
+
+
+def _get_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_user(user_id):
+    """Drop the cached authentication of ``user_id`` in every process once the transaction commits."""
+    def invalidate():
+        cache.set(_version_key(user_id), uuid.uuid4().hex, timeout=None)
+        with _lock:
+            _users.pop(str(user_id), None)
+    transaction.on_commit(invalidate)
+
+
+def _load(user_id):
+    key = str(user_id)
+    version = _get_version(key)
+    with _lock:
+        entry = _users.get(key)
+        if entry and entry[0] == version and entry[1] > time.monotonic():
+            _users.move_to_end(key)
+            return entry[2]
+
+    # The version is read before the row: an invalidation in between leaves
+    # this entry under the old version, so the next request reloads it.
+    values = User.objects.filter(pk=user_id).values_list(*_COLUMNS).first()
+    if values is None:
+        return None
+    with _lock:
+        _users[key] = (version, time.monotonic() + settings.AUTH_USER_CACHE_TTL, values)
+        _users.move_to_end(key)
+        while len(_users) > settings.AUTH_USER_CACHE_SIZE:
+            _users.popitem(last=False)
+    return values
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which is not cached.
+            user = super().get_user(validated_token)
+        else:
+            user = self._get_cached_user(validated_token)
+        if revocation.is_revoked(validated_token, user):
+            raise AuthenticationFailed('Session revoquee, veuillez vous reconnecter', code='token_revoked')
+        return user
+
+    def _get_cached_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        values = _load(user_id)
+        if values is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        user = User.from_db('default', _COLUMNS, values)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import BCryptSHA256PasswordHasher
+
+
+class CAFBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """``bcrypt_sha256`` with the work factor taken from ``BCRYPT_ROUNDS``.
+
+    Same algorithm name, so existing hashes still verify; ``must_update``
+    flags those made with another cost and login rehashes them.
+    """
+
+    @property
+    def rounds(self):
+        return settings.BCRYPT_ROUNDS
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from core import bench
+
+
+class Command(BaseCommand):
+    help = 'Login throughput and latency of another endpoint while logins saturate a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000')
+        parser.add_argument('--telephone', default='0700000010')
+        parser.add_argument('--password', default='agent123')
+        parser.add_argument('--duration', type=float, default=15)
+        parser.add_argument('--login-clients', type=int, default=30)
+        parser.add_argument('--probe-path', default='/api/settings/')
+        parser.add_argument('--probe-clients', type=int, default=2)
+        parser.add_argument('--probe-interval', type=float, default=0.25, help='Pause between probe requests (s)')
+
+    def handle(self, *args, **options):
+        base = options['url'].rstrip('/')
+        credentials = {'telephone': options['telephone'], 'motDePasse': options['password']}
+
+        token = bench.login(base, options['telephone'], options['password'])
+
+        deadline = time.monotonic() + options['duration']
+        logins = Counter()
+        login_latencies, probe_latencies = [], []
+        probe_statuses = Counter()
+        lock = threading.Lock()
+
+        def login_client():
+            while time.monotonic() < deadline:
+                status, seconds, _, retry_after = bench.request(f'{base}/api/auth/login/', credentials)
+                with lock:
+                    logins[status] += 1
+                    if status == 200:
+                        login_latencies.append(seconds)
+                if retry_after:
+                    time.sleep(float(retry_after))
+
+        def probe_client():
+            while time.monotonic() < deadline:
+                status, seconds, _, _ = bench.request(base + options['probe_path'], token=token)
+                with lock:
+                    probe_statuses[status] += 1
+                    probe_latencies.append(seconds)
+                time.sleep(options['probe_interval'])
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=login_client) for _ in range(options['login_clients'])]
+        threads += [threading.Thread(target=probe_client) for _ in range(options['probe_clients'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Requests in flight at the deadline count, so divide by the real time.
+        duration = time.monotonic() - start
+        self.stdout.write(
+            f"logins: {logins[200] / duration:.1f}/s reussis sur {duration:.0f} s, statuts {dict(logins)}"
+            + (f', p50 {bench.percentiles(login_latencies)[0] * 1000:.0f} ms' if login_latencies else '')
+        )
+        if probe_latencies:
+            p50, p99, pire = bench.percentiles(probe_latencies)
+            self.stdout.write(
+                f"{options['probe_path']}: {len(probe_latencies)} requetes, statuts {dict(probe_statuses)}, "
+                f'p50 {p50 * 1000:.0f} ms, p99 {p99 * 1000:.0f} ms, max {pire * 1000:.0f} ms'
+            )
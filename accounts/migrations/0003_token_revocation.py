@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:29
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_zone_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='tokens_revoked_before',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='TokenRevoque',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('jti', models.CharField(max_length=64, unique=True)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens_revoques', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'tokens_revoques',
+                'indexes': [models.Index(fields=['expires_at'], name='tokens_revo_expires_9a7a26_idx'), models.Index(fields=['created_at'], name='tokens_revo_created_5b77b5_idx')],
+            },
+        ),
+    ]
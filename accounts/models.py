@@ -17,6 +17,8 @@ class User(AbstractUser):
     role = models.CharField(max_length=10, choices=UserRole.choices)
     zone = models.CharField(max_length=100, blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    # Access tokens issued before this instant are rejected (see accounts.revocation).
+    tokens_revoked_before = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -36,7 +38,27 @@ class User(AbstractUser):
         indexes = [
             models.Index(fields=['role']),
             models.Index(fields=['is_active']),
+            models.Index(fields=['zone']),
         ]
 
     def __str__(self):
         return f'{self.nom} ({self.telephone})'
+
+
+class TokenRevoque(models.Model):
+    """Access token revoked before its expiry (logout)."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    jti = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tokens_revoques')
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'tokens_revoques'
+        indexes = [
+            models.Index(fields=['expires_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return self.jti
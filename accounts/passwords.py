@@ -0,0 +1,61 @@
+"""Password verification for login, off the request thread and bounded.
+
+bcrypt takes hundreds of milliseconds of CPU per check. Run inline, a
+burst of logins occupies every gunicorn thread and stalls the rest of the
+API. Checks go to a small per-process pool instead (bcrypt releases the
+GIL, so the worker's other threads keep serving requests), with at most
+``LOGIN_HASH_QUEUE`` checks waiting: beyond that login answers 429 at
+once, and a check still queued after ``LOGIN_HASH_TIMEOUT`` seconds
+gives up with 503. A check that has started always runs to completion.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from accounts.models import User
+from core.exceptions import ServiceUnavailableError, TooManyRequestsError
+
+_executor = ThreadPoolExecutor(max_workers=settings.LOGIN_HASH_WORKERS, thread_name_prefix='login-hash')
+_slots = threading.BoundedSemaphore(settings.LOGIN_HASH_WORKERS + settings.LOGIN_HASH_QUEUE)
+
+
+def _verify(raw_password, encoded):
+    """``(is_correct, new_encoded)``; ``new_encoded`` is set when the hash needs the current cost."""
+    is_correct, must_update = hashers.verify_password(raw_password, encoded)
+    if is_correct and must_update:
+        return True, hashers.make_password(raw_password)
+    return is_correct, None
+
+
+def _submit(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise TooManyRequestsError()
+    started = threading.Event()
+
+    def run():
+        started.set()
+        return fn(*args)
+
+    try:
+        future = _executor.submit(run)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    # cancel() fails once the check has started: it then runs to the end.
+    if not started.wait(settings.LOGIN_HASH_TIMEOUT) and future.cancel():
+        raise ServiceUnavailableError()
+    return future.result()
+
+
+def verify_password(user, raw_password):
+    """Check ``raw_password`` for ``user`` in the pool, upgrading its hash if needed."""
+    encoded = user.password
+    is_correct, new_encoded = _submit(_verify, raw_password, encoded)
+    if new_encoded:
+        # Conditional so that a password changed meanwhile is not overwritten.
+        User.objects.filter(pk=user.pk, password=encoded).update(password=new_encoded)
+        user.password = new_encoded
+    return is_correct
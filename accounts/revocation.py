@@ -0,0 +1,123 @@
+"""Revocation of access tokens before they expire.
+
+Logout stores the token's ``jti`` in ``tokens_revoques`` until the token
+would have expired; deactivating a user sets ``tokens_revoked_before``,
+which rejects every token issued until then.
+
+Checking ``tokens_revoques`` on each request would add a query to every
+call, so each process keeps a Bloom filter of the live jtis. A token
+absent from the filter is not revoked (no false negatives); only the rare
+hits, revoked tokens and false positives, are confirmed in the database.
+Revocations bump a version in the shared cache: other processes add the
+new rows to their filter on their next request. The filter is rebuilt
+from scratch every ``_RECONSTRUCTION`` seconds to drop expired jtis.
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import TokenRevoque
+
+_VERSION_KEY = 'caf:revocations'
+_FAUX_POSITIFS = 0.001
+_RECONSTRUCTION = 3600
+# Rows are read from a bit before the previous refresh: created_at is
+# stamped before commit.
+_MARGE = timedelta(seconds=30)
+
+
+class BloomFilter:
+    def __init__(self, capacite, taux=_FAUX_POSITIFS):
+        self.capacite = capacite
+        self.bits = max(64, int(-capacite * math.log(taux) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacite * math.log(2)))
+        self.table = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.table[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.table[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+_lock = threading.Lock()
+_state = {'version': None, 'filtre': None, 'charge_depuis': None, 'reconstruit_a': 0.0}
+
+
+def _get_version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(_VERSION_KEY)
+    return version
+
+
+def _refresh(version):
+    """Bring this process's filter up to ``version``; called with ``_lock`` held."""
+    debut = timezone.now()
+    filtre = _state['filtre']
+    if (
+        filtre is None
+        or time.monotonic() - _state['reconstruit_a'] > _RECONSTRUCTION
+        or filtre.count > filtre.capacite
+    ):
+        jtis = list(TokenRevoque.objects.filter(expires_at__gt=debut).values_list('jti', flat=True))
+        filtre = BloomFilter(capacite=max(1000, 2 * len(jtis)))
+        _state['reconstruit_a'] = time.monotonic()
+    else:
+        jtis = TokenRevoque.objects.filter(
+            created_at__gte=_state['charge_depuis'] - _MARGE,
+        ).values_list('jti', flat=True)
+    for jti in jtis:
+        filtre.add(jti)
+    _state.update(version=version, filtre=filtre, charge_depuis=debut)
+
+
+def is_revoked(token, user):
+    """True if the validated access ``token`` of ``user`` has been revoked."""
+    # ``iat`` is in whole seconds: a token issued in the same second as the
+    # revocation, e.g. a login right after it, is kept.
+    if user.tokens_revoked_before and token['iat'] < int(user.tokens_revoked_before.timestamp()):
+        return True
+
+    jti = token['jti']
+    version = _get_version()
+    with _lock:
+        if version != _state['version'] or time.monotonic() - _state['reconstruit_a'] > _RECONSTRUCTION:
+            _refresh(version)
+        if jti not in _state['filtre']:
+            return False
+    return TokenRevoque.objects.filter(jti=jti).exists()
+
+
+def revoke_token(token, user):
+    """Revoke one access token (logout) until it expires."""
+    now = timezone.now()
+    TokenRevoque.objects.filter(expires_at__lte=now).delete()
+    TokenRevoque.objects.bulk_create([TokenRevoque(
+        jti=token['jti'], user_id=user.pk,
+        expires_at=datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+    )], ignore_conflicts=True)
+    transaction.on_commit(lambda: cache.set(_VERSION_KEY, uuid.uuid4().hex, timeout=None))
+
+
+def revoke_user_tokens(user):
+    """Reject every token issued to ``user`` so far; saves the user."""
+    user.tokens_revoked_before = timezone.now()
+    user.save(update_fields=['tokens_revoked_before', 'updated_at'])
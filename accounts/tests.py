@@ -0,0 +1,57 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import passwords, revocation
+from accounts.models import User
+from core.exceptions import ServiceUnavailableError
+
+
+@override_settings(LOGIN_HASH_TIMEOUT=0.2)
+class PasswordPoolTimeoutTests(SimpleTestCase):
+    def test_timeout_applies_to_queued_checks_only(self):
+        results, errors = [], []
+
+        def slow_check():
+            time.sleep(0.6)
+            return 'fini'
+
+        def login():
+            try:
+                results.append(passwords._submit(slow_check))
+            except ServiceUnavailableError as exc:
+                errors.append(exc)
+
+        # With one pool thread, the first check runs past the timeout and the
+        # second one waits behind it and gives up.
+        with mock.patch.object(passwords, '_executor', ThreadPoolExecutor(max_workers=1)):
+            first = threading.Thread(target=login)
+            first.start()
+            time.sleep(0.05)
+            login()
+            first.join()
+
+        self.assertEqual(results, ['fini'])
+        self.assertEqual(len(errors), 1)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RevokedBeforeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(nom='Agent', telephone='0710000000', role='agent')
+        self.token = AccessToken.for_user(self.user)
+        self.issued = datetime.fromtimestamp(self.token['iat'], tz=timezone.utc)
+
+    def test_token_issued_in_the_revocation_second_is_kept(self):
+        # A login right after the revocation, within the same second.
+        self.user.tokens_revoked_before = self.issued + timedelta(seconds=0.1)
+        self.assertFalse(revocation.is_revoked(self.token, self.user))
+
+    def test_token_issued_before_the_revocation_second_is_revoked(self):
+        self.user.tokens_revoked_before = self.issued + timedelta(seconds=1.1)
+        self.assertTrue(revocation.is_revoked(self.token, self.user))
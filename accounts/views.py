@@ -1,4 +1,4 @@
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, Sum
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import serializers as drf_serializers
 from rest_framework import status
@@ -8,6 +8,8 @@ from rest_framework.views import APIView
 from rest_framework.viewsets import ViewSet
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from accounts import passwords, revocation
+from accounts.authentication import invalidate_user
 from accounts.models import User
 from accounts.serializers import (
     LoginSerializer,
@@ -15,8 +17,10 @@ from accounts.serializers import (
     UserReadSerializer,
     UserUpdateSerializer,
 )
+from core.cache import bump_data_version
 from core.pagination import CAFPagination
 from core.permissions import IsAdmin
+from core.search import search
 
 
 # --- Schema helpers ---
@@ -37,7 +41,8 @@ class LoginView(APIView):
         request=LoginSerializer,
         responses={200: _LoginResponseSerializer},
         summary='Connexion',
-        description='Authentification par telephone et mot de passe. Retourne un JWT.',
+        description='Authentification par telephone et mot de passe. Retourne un JWT. '
+                    'Repond 429 (ou 503) avec Retry-After quand trop de connexions sont en cours.',
     )
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -54,7 +59,7 @@ class LoginView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-        if not user.check_password(mot_de_passe):
+        if not passwords.verify_password(user, mot_de_passe):
             return Response(
                 {'error': {'code': 'UNAUTHORIZED', 'message': 'Identifiants invalides'}},
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -85,6 +90,7 @@ class LogoutView(APIView):
         summary='Deconnexion',
     )
     def post(self, request):
+        revocation.revoke_token(request.auth, request.user)
         return Response({'message': 'Deconnexion reussie'})
 
 
@@ -94,7 +100,7 @@ class LogoutView(APIView):
         parameters=[
             OpenApiParameter('role', str, description='Filtrer par role (admin/agent)'),
             OpenApiParameter('isActive', str, description='Filtrer par statut actif (true/false)'),
-            OpenApiParameter('search', str, description='Recherche par nom ou telephone'),
+            OpenApiParameter('search', str, description='Recherche par nom ou telephone (triee par pertinence)'),
         ],
     ),
     retrieve=extend_schema(tags=['Users'], summary='Detail utilisateur'),
@@ -116,9 +122,9 @@ class UserViewSet(ViewSet):
         if is_active is not None:
             qs = qs.filter(is_active=is_active.lower() in ('true', '1'))
 
-        search = request.query_params.get('search')
-        if search:
-            qs = qs.filter(Q(nom__icontains=search) | Q(telephone__icontains=search))
+        term = request.query_params.get('search')
+        if term:
+            qs = search(qs, term, ['nom', 'telephone']).order_by('-pertinence', '-created_at')
 
         paginator = CAFPagination()
         page = paginator.paginate_queryset(qs, request)
@@ -158,6 +164,7 @@ class UserViewSet(ViewSet):
         serializer = UserCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
+        bump_data_version()
         return Response(UserReadSerializer(user).data, status=status.HTTP_201_CREATED)
 
     def partial_update(self, request, pk=None):
@@ -174,6 +181,10 @@ class UserViewSet(ViewSet):
         )
         serializer.is_valid(raise_exception=True)
         user = serializer.update(user, serializer.validated_data)
+        if serializer.validated_data.get('isActive') is False:
+            revocation.revoke_user_tokens(user)
+        invalidate_user(user.id)
+        bump_data_version()
         return Response(UserReadSerializer(user).data)
 
     def destroy(self, request, pk=None):
@@ -195,4 +206,7 @@ class UserViewSet(ViewSet):
 
         user.is_active = False
         user.save()
+        revocation.revoke_user_tokens(user)
+        invalidate_user(user.id)
+        bump_data_version()
         return Response({'message': 'Utilisateur desactive'})
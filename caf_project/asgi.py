@@ -1,3 +1,14 @@
+"""ASGI entry point, an alternative to the gunicorn WSGI server (see Dockerfile).
+
+    uvicorn caf_project.asgi:application --host 0.0.0.0 --port 8000 --workers 3
+
+or ``docker compose --profile asgi up web-asgi``. DRF 3.15 has no async
+views, so every view stays synchronous and Django runs each request in a
+thread: this serves the same API with the same concurrency as gunicorn's
+gthread workers, not more. The dashboards fan their sub-queries out on
+``core.fanout``'s thread pool under either server. Requests are not capped
+by a thread count here, so DB_POOL_TIMEOUT is what sheds load (503).
+"""
 import os
 
 from django.core.asgi import get_asgi_application
@@ -72,15 +72,98 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'caf_password'),
         'HOST': os.getenv('POSTGRES_HOST', 'db'),
         'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        # Pooled connections are returned to the pool after each request.
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
 
+# Connection pool per process (psycopg_pool), checked before each use and
+# recycled after DB_POOL_MAX_LIFETIME seconds. A request waiting more than
+# DB_POOL_TIMEOUT seconds for a connection gets a 503. Keep MAX_SIZE at
+# least gunicorn --threads + REPORT_QUERY_THREADS. DB_POOL_MAX_SIZE=0
+# disables the pool: one connection per request.
+if int(os.getenv('DB_POOL_MAX_SIZE', '12')):
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'name': 'caf',
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '12')),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+    }
+
+# Server-side prepared statements: a query run DB_PREPARE_THRESHOLD times
+# on a connection is prepared and no longer planned on each call. This
+# needs server-side parameter binding; empty disables both (required
+# behind a transaction-mode pgbouncer).
+if os.getenv('DB_PREPARE_THRESHOLD', '5'):
+    DATABASES['default']['OPTIONS'].update(
+        server_side_binding=True,
+        prepare_threshold=int(os.getenv('DB_PREPARE_THRESHOLD', '5')),
+    )
+
+# Cache (report responses, and the version keys that invalidate the report,
+# user and revocation caches). Every process serving the API must see the
+# same cache: with ``file``, all of them must share CACHE_LOCATION (the
+# compose services mount one volume there); across hosts use ``database``
+# (CACHE_LOCATION is then the table, created by createcachetable). locmem
+# is only correct with a single process.
+_CACHE_BACKENDS = {
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'database': 'django.core.cache.backends.db.DatabaseCache',
+}
+CACHES = {
+    'default': {
+        'BACKEND': _CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'file')],
+        'LOCATION': os.getenv('CACHE_LOCATION', '/tmp/caf_cache'),
+        'TIMEOUT': int(os.getenv('CACHE_TTL_SECONDS', '300')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '2000')),
+            'CULL_FREQUENCY': 4,
+        },
+    }
+}
+
+# Totals of paginated lists: exact (COUNT on every page), cached (COUNT
+# memoised per filter signature and data version) or estimated (planner
+# estimate once it exceeds the threshold, exact COUNT below it). cached is
+# only exact while every write bumps the data version (core.cache): opt in
+# per deployment.
+PAGINATION_COUNT_STRATEGY = os.getenv('PAGINATION_COUNT_STRATEGY', 'exact')
+PAGINATION_COUNT_TTL = int(os.getenv('PAGINATION_COUNT_TTL', '60'))
+PAGINATION_ESTIMATE_THRESHOLD = int(os.getenv('PAGINATION_ESTIMATE_THRESHOLD', '10000'))
+
+# Per-process cache of the authenticated user (accounts.authentication).
+# Invalidations go through the default cache, which must be shared by every
+# process (see CACHES); otherwise a deactivation is only seen elsewhere
+# after AUTH_USER_CACHE_TTL.
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '300'))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', '10000'))
+
+# bcrypt work factor; hashes made with another cost are rehashed at login.
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+# Password checks at login (accounts.passwords), per gunicorn worker: pool
+# size, checks allowed to wait (429 beyond) and seconds a check may wait
+# before it starts (503); a started check is never cut short.
+# Waiting logins hold a request thread: keep WORKERS + QUEUE below the
+# gunicorn --threads so other requests always find a free one.
+LOGIN_HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', '1'))
+LOGIN_HASH_QUEUE = int(os.getenv('LOGIN_HASH_QUEUE', '2'))
+LOGIN_HASH_TIMEOUT = float(os.getenv('LOGIN_HASH_TIMEOUT', '5'))
+
+# Threads per process running dashboard sub-queries concurrently
+# (core.fanout); each keeps a database connection open.
+REPORT_QUERY_THREADS = int(os.getenv('REPORT_QUERY_THREADS', '8'))
+
 AUTH_USER_MODEL = 'accounts.User'
 
 AUTH_PASSWORD_VALIDATORS = []
 
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'accounts.hashers.CAFBCryptSHA256PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2PasswordHasher',
 ]
 
@@ -97,7 +180,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -1,6 +1,13 @@
+import os
+
 from django.apps import AppConfig
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core.db import forget_inherited_pools
+
+        os.register_at_fork(after_in_child=forget_inherited_pools)
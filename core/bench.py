@@ -0,0 +1,43 @@
+"""HTTP client helpers shared by the ``bench_*`` management commands."""
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+
+from django.core.management.base import CommandError
+
+
+def request(url, body=None, token=None):
+    """``(status, seconds, body, retry_after)`` of one call: a POST of ``body`` as JSON, else a GET."""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(body).encode() if body is not None else None
+    start = time.perf_counter()
+    content = retry_after = None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers), timeout=60) as response:
+            content = response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+        retry_after = exc.headers.get('Retry-After')
+    except OSError:
+        status = 'erreur'
+    return status, time.perf_counter() - start, content, retry_after
+
+
+def login(base, telephone, password):
+    """Access token for ``telephone`` on the server at ``base``."""
+    status, _, content, _ = request(f'{base}/api/auth/login/', {'telephone': telephone, 'motDePasse': password})
+    if status != 200:
+        raise CommandError(f'Login impossible sur {base}: {status}')
+    return json.loads(content)['token']
+
+
+def percentiles(latencies):
+    """``(p50, p99, max)`` of ``latencies``, in the same unit."""
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return statistics.median(ordered), p99, ordered[-1]
@@ -0,0 +1,57 @@
+"""Versioned response cache for the report endpoints.
+
+Report responses only change when the underlying data changes, so instead of
+tracking which entries a write affects, every write bumps a global data
+version and the version is part of each cache key. Stale entries are never
+read again and age out through the backend's TTL and size-based culling.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+_VERSION_KEY = 'caf:data-version'
+
+
+def get_data_version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        # The key may have been culled; any fresh token invalidates old entries.
+        cache.add(_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(_VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    """Invalidate every cached report once the current transaction commits."""
+    transaction.on_commit(
+        lambda: cache.set(_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    )
+
+
+def _report_key(request):
+    params = sorted(
+        (k, v) for k, values in request.query_params.lists() for v in values if v != ''
+    )
+    user = request.user
+    scope = user.role if user.role == 'admin' else f'{user.role}:{user.id}'
+    raw = f'{request.path}|{params}|{scope}|{get_data_version()}'
+    return 'caf:report:' + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def cached_report(method):
+    """Cache a report view's successful ``get`` response data."""
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = _report_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data)
+        return response
+    return wrapper
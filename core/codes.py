@@ -0,0 +1,86 @@
+"""Unique business codes (``REC-XXXXXX``, ``CAF-XXXXXX``) without a query per code.
+
+Each prefix has a PostgreSQL sequence that advances by ``BLOCK_SIZE``
+(``core/migrations/0003_code_sequences``). A process reserves a block with
+one ``nextval`` and hands its numbers out from memory. Sequences never give
+the same value twice, so blocks are disjoint across threads, gunicorn
+workers and hosts.
+
+Numbers are scrambled with a bijection on 30 bits (multiplication by an odd
+constant modulo 2**30) and written as 6 characters of ``CHARSET``, so
+consecutive codes do not look sequential. Codes issued before the allocator
+existed were random; each block is checked against the table once and any
+legacy code it would repeat is skipped.
+"""
+import os
+import random
+import threading
+
+from django.db import connection
+
+from core.utils import CHARSET
+
+BLOCK_SIZE = 100  # must match INCREMENT BY of the sequences
+CODE_LENGTH = 6
+_BITS = 30  # 32 symbols ** 6 characters
+_MASK = (1 << _BITS) - 1
+_MULTIPLIER = 387420489  # odd, hence invertible modulo 2**30
+_OFFSET = 0x1B2E3F4
+
+_lock = threading.Lock()
+_blocks = {}  # prefix -> (pid, list of codes still available)
+
+
+def _encode(number):
+    value = (number * _MULTIPLIER + _OFFSET) & _MASK
+    chars = []
+    for _ in range(CODE_LENGTH):
+        value, digit = divmod(value, len(CHARSET))
+        chars.append(CHARSET[digit])
+    return ''.join(reversed(chars))
+
+
+def sequence_name(prefix):
+    return f'codes_{prefix.lower()}_seq'
+
+
+def _reserve_block(prefix, model_class, field):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT nextval(%s)', [sequence_name(prefix)])
+        start = cursor.fetchone()[0]
+    codes = [f'{prefix}-{_encode(n)}' for n in range(start, start + BLOCK_SIZE)]
+    taken = set(model_class.objects.filter(**{f'{field}__in': codes}).values_list(field, flat=True))
+    return [code for code in codes if code not in taken]
+
+
+def _random_codes(prefix, model_class, count, field):
+    codes = set()
+    while len(codes) < count:
+        candidates = {
+            prefix + '-' + ''.join(random.choices(CHARSET, k=CODE_LENGTH))
+            for _ in range(count - len(codes))
+        } - codes
+        taken = set(model_class.objects.filter(**{f'{field}__in': candidates}).values_list(field, flat=True))
+        codes |= candidates - taken
+    return list(codes)
+
+
+def allocate_codes(prefix, model_class, count=1, field='code'):
+    """``count`` unused codes for ``model_class``, e.g. ``['REC-7KQ2MZ']``."""
+    if connection.vendor != 'postgresql':
+        return _random_codes(prefix, model_class, count, field)
+
+    codes = []
+    with _lock:
+        pid, available = _blocks.get(prefix, (None, []))
+        if pid != os.getpid():
+            # Blocks reserved before a fork would be shared with the parent.
+            available = []
+        while len(codes) < count:
+            if not available:
+                available = _reserve_block(prefix, model_class, field)
+            take = min(count - len(codes), len(available))
+            codes.extend(available[:take])
+            available = available[take:]
+        _blocks[prefix] = (os.getpid(), available)
+    return codes
@@ -0,0 +1,54 @@
+"""Per-process database connection pool (``DATABASES['default']['OPTIONS']['pool']``).
+
+Django opens the pool lazily in each process. A process forked after that
+(``gunicorn --preload``, multiprocessing) would share the parent's
+connections; :func:`forget_inherited_pools` runs in every child and makes
+it open its own.
+"""
+import os
+
+from django.db import connection
+
+_herites = []
+
+
+def forget_inherited_pools():
+    from django.db.backends.postgresql.base import DatabaseWrapper
+
+    # Closing the inherited pools would end the parent's sessions; keep them
+    # referenced so their connections are never finalized in the child.
+    _herites.append(dict(DatabaseWrapper._connection_pools))
+    DatabaseWrapper._connection_pools.clear()
+
+
+def is_pool_timeout(exc):
+    """True if ``exc`` is Django's wrapper around a ``PoolTimeout``."""
+    try:
+        from psycopg_pool import PoolTimeout
+    except ImportError:
+        return False
+    return isinstance(exc.__cause__, PoolTimeout)
+
+
+def pool_stats():
+    """Usage of this process's pool, or None when pooling is disabled."""
+    pool = connection.pool
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    return {
+        'pid': os.getpid(),
+        'minSize': stats['pool_min'],
+        'maxSize': stats['pool_max'],
+        'size': stats['pool_size'],
+        'inUse': stats['pool_size'] - stats['pool_available'],
+        'available': stats['pool_available'],
+        'waiting': stats.get('requests_waiting', 0),
+        'requests': stats.get('requests_num', 0),
+        'queued': stats.get('requests_queued', 0),
+        'waitMsTotal': stats.get('requests_wait_ms', 0),
+        'timeouts': stats.get('requests_errors', 0),
+        'connectionsOpened': stats.get('connections_num', 0),
+        'connectionsLost': stats.get('connections_lost', 0),
+        'returnsBad': stats.get('returns_bad', 0),
+    }
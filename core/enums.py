@@ -30,3 +30,19 @@ class CategorieProduit(models.TextChoices):
     HABILLEMENT = 'HABILLEMENT', 'Habillement'
     ELECTRONIQUE = 'ELECTRONIQUE', 'Electronique'
     AUTRE = 'AUTRE', 'Autre'
+
+
+class RapportType(models.TextChoices):
+    SUMMARY = 'summary', 'Resume global'
+    PAR_JOUR = 'par-jour', 'Revenus par jour'
+    PAR_CATEGORIE = 'par-categorie', 'Ventes par categorie'
+    PAR_METHODE = 'par-methode', 'Repartition par methode de paiement'
+    TOP_AGENTS = 'top-agents', 'Top agents par montant'
+    TOP_PDVS = 'top-pdvs', 'Top points de vente par montant'
+
+
+class RapportJobStatus(models.TextChoices):
+    EN_ATTENTE = 'EN_ATTENTE', 'En attente'
+    EN_COURS = 'EN_COURS', 'En cours'
+    TERMINE = 'TERMINE', 'Termine'
+    ECHOUE = 'ECHOUE', 'Echoue'
@@ -15,7 +15,25 @@ class StatusConflictError(APIException):
     default_code = 'STATUS_CONFLICT'
 
 
+class TooManyRequestsError(APIException):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_detail = 'Trop de connexions en cours, reessayez dans quelques secondes.'
+    default_code = 'TOO_MANY_REQUESTS'
+    wait = 2  # Retry-After
+
+
+class ServiceUnavailableError(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Service momentanement sature, reessayez plus tard.'
+    default_code = 'SERVICE_UNAVAILABLE'
+    wait = 5  # Retry-After
+
+
 def caf_exception_handler(exc, context):
+    from core.db import is_pool_timeout
+
+    if is_pool_timeout(exc):
+        exc = ServiceUnavailableError()
     response = exception_handler(exc, context)
 
     if response is not None:
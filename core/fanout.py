@@ -0,0 +1,43 @@
+"""Independent database sub-queries run concurrently.
+
+Django opens one connection per thread: each call given to
+:func:`run_concurrently` runs in a thread of a shared pool, on that
+thread's connection, so a report waits for its slowest sub-query instead
+of their sum.
+
+The thread pool is bounded (``REPORT_QUERY_THREADS`` per process) since
+each running sub-query holds a database connection. Sub-queries see
+committed data only: they do not share the caller's transaction.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+_executor = ThreadPoolExecutor(max_workers=settings.REPORT_QUERY_THREADS, thread_name_prefix='caf-query')
+
+
+def _isolated(call):
+    def run():
+        try:
+            return call()
+        finally:
+            if getattr(connection, 'pool', None) is not None:
+                connection.close()  # back to the connection pool
+            elif connection.vendor != 'postgresql':
+                # Only the PostgreSQL backend has ``pool``; others close.
+                connection.close()
+            # Without a connection pool, worker threads keep their connection
+            # from one call to the next: opening one per sub-query would cost
+            # more than the queries. Only a broken connection is dropped.
+            elif connection.errors_occurred:
+                if not connection.is_usable():
+                    connection.close()
+                connection.errors_occurred = False
+    return run
+
+
+def run_concurrently(*calls):
+    """Results of the zero-argument ``calls``, in order, run concurrently."""
+    futures = [_executor.submit(_isolated(call)) for call in calls]
+    return [future.result() for future in futures]
@@ -0,0 +1,68 @@
+import json
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from core import bench
+
+_PATHS = [
+    '/api/recouvrements/?pageSize=20',
+    '/api/pdv/?pageSize=20',
+    '/api/users/?pageSize=20',
+    '/api/rapports/summary/',
+    '/api/rapports/par-jour/',
+    '/api/rapports/par-methode/',
+    '/api/admin/stats/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Requests/s of the hot list and report endpoints on a running server, and its connection pool counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000')
+        parser.add_argument('--telephone', default='0700000001')
+        parser.add_argument('--password', default='admin123')
+        parser.add_argument('--duration', type=float, default=20)
+        parser.add_argument('--clients', type=int, default=8)
+        parser.add_argument('--paths', nargs='+', default=_PATHS)
+
+    def handle(self, *args, **options):
+        base = options['url'].rstrip('/')
+        token = bench.login(base, options['telephone'], options['password'])
+
+        paths = options['paths']
+        deadline = time.monotonic() + options['duration']
+        statuses = Counter()
+        latencies = []
+        lock = threading.Lock()
+
+        def client(offset):
+            i = offset
+            while time.monotonic() < deadline:
+                status, seconds, _, _ = bench.request(base + paths[i % len(paths)], token=token)
+                i += 1
+                with lock:
+                    statuses[status] += 1
+                    latencies.append(seconds)
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(options['clients'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Requests in flight at the deadline count, so divide by the real time.
+        duration = time.monotonic() - start
+        p50, p99, _ = bench.percentiles(latencies)
+        self.stdout.write(
+            f'{statuses[200] / duration:.1f} req/s reussies sur {duration:.0f} s, statuts {dict(statuses)}, '
+            f'p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms'
+        )
+
+        status, _, body, _ = bench.request(f'{base}/api/admin/db-pool/', token=token)
+        if status == 200:
+            self.stdout.write(f"pool (un worker): {json.loads(body)['pool']}")
@@ -7,7 +7,8 @@ from django.utils import timezone
 from accounts.models import User
 from core.models import Settings
 from pdv.models import PointDeVente
-from recouvrements.models import LigneRecouvrement, Recouvrement
+from rapports import rollups
+from recouvrements.models import LigneRecouvrement, Recouvrement, articles_summary
 
 TAUX = Decimal('0.02')
 
@@ -225,6 +226,8 @@ class Command(BaseCommand):
                 reference=ref,
                 notes=notes,
                 validated_at=make_aware(validated) if validated else None,
+                resume_articles=articles_summary([ligne[0] for ligne in computed_lignes]),
+                nombre_lignes=len(computed_lignes),
             )
             Recouvrement.objects.filter(pk=rec.pk).update(created_at=make_aware(created))
 
@@ -240,4 +243,6 @@ class Command(BaseCommand):
             rec_count += 1
 
         self.stdout.write(f'  Created {rec_count} recouvrements')
+
+        rollups.rebuild()
         self.stdout.write(self.style.SUCCESS('Seeding complete!'))
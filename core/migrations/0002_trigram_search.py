@@ -0,0 +1,54 @@
+from django.db import migrations
+
+# (table, column) pairs searched by core.search; indexed on UPPER(column)
+# to match the SQL generated for icontains.
+_INDEXES = [
+    ('recouvrements', 'code'),
+    ('points_de_vente', 'nom'),
+    ('points_de_vente', 'code'),
+    ('points_de_vente', 'proprietaire_nom'),
+    ('users', 'nom'),
+    ('users', 'telephone'),
+]
+
+
+def _trigram_available(schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Without pg_trgm (or on another database) search falls back to
+    # unindexed matching; rerun this migration once the extension exists.
+    if not _trigram_available(schema_editor):
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in _INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+            f'ON {table} USING gin (UPPER({column}) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in _INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('accounts', '0002_user_zone_index'),
+        ('pdv', '0002_pointdevente_ville_commune_index'),
+        ('recouvrements', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
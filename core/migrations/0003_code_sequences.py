@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# One sequence per code prefix; each nextval reserves a block of 100 numbers
+# (core.codes.BLOCK_SIZE) within the 30 bits a 6-character code can hold.
+_PREFIXES = ['rec', 'caf']
+
+
+def create_sequences(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for prefix in _PREFIXES:
+        schema_editor.execute(
+            f'CREATE SEQUENCE IF NOT EXISTS codes_{prefix}_seq '
+            f'INCREMENT BY 100 MINVALUE 0 MAXVALUE 1073741823 START WITH 0'
+        )
+
+
+def drop_sequences(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for prefix in _PREFIXES:
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS codes_{prefix}_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_trigram_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequences, drop_sequences),
+    ]
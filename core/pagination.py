@@ -1,17 +1,201 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
+from core.cache import get_data_version
+
+
+def _estimate(queryset):
+    """Planner row estimate: ``reltuples`` for a whole table, else ``EXPLAIN``."""
+    query = queryset.query
+    with connection.cursor() as cursor:
+        if not query.where and not query.distinct:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            reltuples = cursor.fetchone()[0]
+            if reltuples >= 0:  # -1 until the table is first analysed
+                return reltuples
+        sql, params = query.sql_with_params()
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_total(queryset):
+    """``(total, exact)`` for ``queryset`` per ``settings.PAGINATION_COUNT_STRATEGY``."""
+    queryset = queryset.order_by()
+    strategy = settings.PAGINATION_COUNT_STRATEGY
+
+    if strategy == 'estimated' and connection.vendor == 'postgresql':
+        estimate = _estimate(queryset)
+        if estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD:
+            return estimate, False
+
+    elif strategy == 'cached':
+        # Same SQL and same data version give the same count, so a hit is exact.
+        signature = repr(queryset.query.sql_with_params()) + get_data_version()
+        key = 'caf:count:' + hashlib.sha256(signature.encode()).hexdigest()
+        total = cache.get(key)
+        if total is None:
+            total = queryset.count()
+            cache.set(key, total, settings.PAGINATION_COUNT_TTL)
+        return total, True
+
+    return queryset.count(), True
+
+
+class CAFPaginator(Paginator):
+    """Page numbers are checked against the count only when it is exact.
+
+    An estimate can be short or long: a page past it is read anyway and is
+    only out of range if it has no rows.
+    """
+    count_exact = True
+
+    @cached_property
+    def count(self):
+        total, self.count_exact = count_total(self.object_list)
+        return total
+
+    def validate_number(self, number):
+        self.count  # sets count_exact
+        if self.count_exact:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = self.object_list[bottom:bottom + self.per_page]
+        if number > 1 and not rows:
+            raise EmptyPage(self.error_messages['no_results'])
+        return self._get_page(rows, number, self)
+
 
 class CAFPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'pageSize'
     page_query_param = 'page'
     max_page_size = 100
+    django_paginator_class = CAFPaginator
 
     def get_paginated_response(self, data):
         return Response({
             'data': data,
             'total': self.page.paginator.count,
+            'totalExact': self.page.paginator.count_exact,
             'page': self.page.number,
             'pageSize': self.get_page_size(self.request),
         })
+
+
+class CAFCursorPagination(CAFPagination):
+    """Keyset pagination on ``(sort field, pk)``, used when ``?cursor=`` is present.
+
+    Each page seeks past the last row seen with a row-value comparison, so
+    deep pages cost the same as the first one. An empty ``cursor`` starts at
+    the top; ``nextCursor``/``prevCursor`` are opaque and tied to the sort.
+    The total is only counted with ``withTotal=true``, using ``count_total``.
+    """
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, ordering):
+        self.request = request
+        self.ordering = ordering
+        self.field = ordering.lstrip('-')
+        page_size = self.get_page_size(request)
+        model = queryset.model
+        self.pk_name = model._meta.pk.attname
+
+        token = request.query_params.get(self.cursor_query_param)
+        direction, seek = ('next', None) if not token else self.decode_cursor(token, model)
+        forward = direction == 'next'
+        descending = ordering.startswith('-') == forward
+        prefix = '-' if descending else ''
+
+        qs = queryset
+        if seek:
+            qs = qs.filter(self._seek(model, descending, seek))
+        rows = list(qs.order_by(f'{prefix}{self.field}', f'{prefix}pk')[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not forward:
+            rows.reverse()
+
+        has_next = has_more if forward else bool(rows)
+        has_prev = (seek is not None) if forward else has_more
+        self.next_cursor = self.encode_cursor('next', rows[-1]) if rows and has_next else None
+        self.prev_cursor = self.encode_cursor('prev', rows[0]) if rows and has_prev else None
+
+        self.total = self.total_exact = None
+        if request.query_params.get('withTotal', '').lower() in ('1', 'true'):
+            self.total, self.total_exact = count_total(queryset)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'data': data,
+            'total': self.total,
+            'totalExact': self.total_exact,
+            'pageSize': self.get_page_size(self.request),
+            'nextCursor': self.next_cursor,
+            'prevCursor': self.prev_cursor,
+        })
+
+    def encode_cursor(self, direction, obj):
+        # Rows may be model instances or ``.values()`` dicts.
+        row = obj if isinstance(obj, dict) else obj.__dict__
+        value = row[self.field]
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        raw = json.dumps([self.ordering, direction, value, str(row[self.pk_name])])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token, model):
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            ordering, direction, value, pk = json.loads(raw)
+            if ordering != self.ordering or direction not in ('next', 'prev'):
+                raise ValueError
+            return direction, (
+                model._meta.get_field(self.field).to_python(value),
+                model._meta.pk.to_python(pk),
+            )
+        except Exception:
+            raise ValidationError({self.cursor_query_param: 'Curseur invalide ou ne correspondant pas au tri.'})
+
+    def _seek(self, model, descending, seek):
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        column = quote(model._meta.get_field(self.field).column)
+        pk = quote(model._meta.pk.column)
+        op = '<' if descending else '>'
+        return RawSQL(
+            f'({table}.{column}, {table}.{pk}) {op} (%s, %s)', seek, output_field=BooleanField(),
+        )
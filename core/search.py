@@ -0,0 +1,77 @@
+"""Ranked substring search for the list endpoints.
+
+On PostgreSQL with ``pg_trgm`` (see ``core/migrations/0002_trigram_search``)
+every searched column carries a GIN trigram index on ``UPPER(col)``, which
+is exactly the expression Django emits for ``icontains``, and results are
+ranked by ``word_similarity``. Elsewhere the same filters run unindexed and
+rows are ranked exact match > prefix > substring.
+
+Fields on related models are matched through a subquery on their own table.
+On PostgreSQL it is written ``fk = ANY(ARRAY(subquery))`` rather than
+``fk IN (subquery)``: the planner can then combine the per-column index scans
+with a BitmapOr instead of filtering every row against a hashed subplan.
+"""
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, IntegerField, Lookup, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+
+class _AnyOf(Lookup):
+    """``lhs = ANY(ARRAY(subquery))`` (PostgreSQL)."""
+    lookup_name = 'any_of'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = compiler.compile(self.rhs)
+        return f'{lhs} = ANY(ARRAY({rhs}))', (*lhs_params, *rhs_params)
+
+
+@lru_cache(maxsize=None)
+def trigram_enabled():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def _match(model, field, term):
+    if '__' not in field:
+        return Q(**{f'{field}__icontains': term})
+    relation, rest = field.split('__', 1)
+    related = model._meta.get_field(relation).related_model
+    ids = related.objects.filter(_match(related, rest, term)).values('pk')
+    if connection.vendor == 'postgresql':
+        return Q(_AnyOf(F(relation), Subquery(ids)))
+    return Q(**{f'{relation}__in': ids})
+
+
+def _rank(field, term):
+    if trigram_enabled():
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return Coalesce(TrigramWordSimilarity(term, field), Value(0.0), output_field=FloatField())
+    return Case(
+        When(**{f'{field}__iexact': term}, then=Value(3)),
+        When(**{f'{field}__istartswith': term}, then=Value(2)),
+        When(**{f'{field}__icontains': term}, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def search(queryset, term, fields):
+    """Rows of ``queryset`` matching ``term`` in any of ``fields``, annotated with ``pertinence``.
+
+    ``fields`` are lookups on the model, optionally through foreign keys
+    (``point_de_vente__nom``). Order by ``-pertinence`` to rank the results.
+    """
+    model = queryset.model
+    condition = Q()
+    for field in fields:
+        condition |= _match(model, field, term)
+    ranks = [_rank(field, term) for field in fields]
+    pertinence = Greatest(*ranks) if len(ranks) > 1 else ranks[0]
+    return queryset.filter(condition).annotate(pertinence=pertinence)
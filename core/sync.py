@@ -0,0 +1,132 @@
+"""Incremental sync for agent devices.
+
+The watermark records, per collection, the ``(updated_at, id)`` of the
+last row sent. Each sync seeks past it on the ``(agent, updated_at, id)``
+indexes, so only rows changed since the previous call are read; the first
+sync (no watermark) pages through everything the same way.
+
+``updated_at`` is stamped before the writing transaction commits, so a row
+stamped just before a sync may only become visible after it. A sync only
+sends rows stamped before every write transaction still open
+(``pg_stat_activity.xact_start`` of the sessions holding a transaction id),
+so the watermark never moves past rows that are not committed yet, however
+long their transaction runs. ``MARGE`` covers what ``xact_start`` misses:
+Django stamps the row just before sending its write, possibly before the
+transaction starts, and on the application's clock.
+
+Deleted PDVs and PDVs reassigned to another agent leave no row to send;
+``pdvIds`` lists every PDV the agent can see so the device drops the
+others. Recouvrements are never deleted nor reassigned.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from core.models import Settings
+from core.serializers import SettingsSerializer
+from pdv.models import PointDeVente
+from pdv.serializers import PDVListSerializer
+from recouvrements import projections
+from recouvrements.models import Recouvrement
+
+MARGE = timedelta(seconds=2)
+LIMITE = 500
+LIMITE_MAX = 1000
+
+
+def encode_watermark(positions):
+    raw = json.dumps(positions)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_watermark(token):
+    """``{'pdv': [updated_at, id], 'rec': [updated_at, id], 'settings': updated_at}`` (ISO strings)."""
+    if not token:
+        return {'pdv': None, 'rec': None, 'settings': None}
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        for key in ('pdv', 'rec'):
+            if positions[key] is not None:
+                updated_at, pk = positions[key]
+                datetime.fromisoformat(updated_at)
+                uuid.UUID(pk)
+        if positions['settings'] is not None:
+            datetime.fromisoformat(positions['settings'])
+        return positions
+    except Exception:
+        raise ValidationError({'watermark': 'Watermark invalide.'})
+
+
+def _since(queryset, position, fin, limite):
+    """Rows of ``queryset`` after ``position`` and before ``fin``, oldest first, and whether more remain."""
+    qs = queryset.filter(updated_at__lt=fin)
+    if position:
+        table = queryset.model._meta.db_table
+        qs = qs.filter(RawSQL(
+            f'("{table}"."updated_at", "{table}"."id") > (%s::timestamptz, %s::uuid)', position,
+            output_field=BooleanField(),
+        ))
+    rows = list(qs.order_by('updated_at', 'id')[:limite + 1])
+    return rows[:limite], len(rows) > limite
+
+
+def _position(row):
+    if isinstance(row, dict):
+        return [row['updated_at'].isoformat(), str(row['id'])]
+    return [row.updated_at.isoformat(), str(row.id)]
+
+
+def _fin():
+    """Upper bound on ``updated_at`` of the rows a sync may send."""
+    if connection.vendor != 'postgresql':
+        return timezone.now() - MARGE
+    # Sessions of other roles show no xact_start: the application must
+    # write with a single role.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT least(clock_timestamp(), min(xact_start)) FROM pg_stat_activity '
+            'WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()'
+        )
+        return cursor.fetchone()[0] - MARGE
+
+
+def changes(agent, watermark=None, limite=LIMITE):
+    """Everything visible to ``agent`` that changed since ``watermark``, with the next watermark."""
+    positions = decode_watermark(watermark)
+    fin = _fin()
+
+    pdvs, pdvs_restants = _since(
+        PointDeVente.objects.filter(agent=agent).select_related('agent'),
+        positions['pdv'], fin, limite,
+    )
+    recs, recs_restants = _since(
+        projections.list_values(Recouvrement.objects.filter(agent=agent), extra=['updated_at']),
+        positions['rec'], fin, limite,
+    )
+    settings = Settings.get()
+    settings_modifies = settings.updated_at < fin and (
+        positions['settings'] is None
+        or settings.updated_at > datetime.fromisoformat(positions['settings'])
+    )
+
+    if pdvs:
+        positions['pdv'] = _position(pdvs[-1])
+    if recs:
+        positions['rec'] = _position(recs[-1])
+    if settings_modifies:
+        positions['settings'] = settings.updated_at.isoformat()
+    return {
+        'pointsDeVente': PDVListSerializer(pdvs, many=True).data,
+        'pdvIds': [str(pk) for pk in PointDeVente.objects.filter(agent=agent).values_list('id', flat=True)],
+        'recouvrements': projections.represent(recs),
+        'settings': SettingsSerializer(settings).data if settings_modifies else None,
+        'watermark': encode_watermark(positions),
+        'hasMore': pdvs_restants or recs_restants,
+    }
@@ -0,0 +1,147 @@
+import multiprocessing
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.paginator import EmptyPage
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from core import codes, sync
+from core.pagination import CAFPaginator
+from pdv.models import PointDeVente
+
+
+def _allocate_in_threads(threads=4, rounds=25, count=10):
+    """Codes allocated by ``threads`` threads, each on its own connection."""
+    allocated = []
+    lock = threading.Lock()
+
+    def run():
+        try:
+            for _ in range(rounds):
+                batch = codes.allocate_codes('CAF', PointDeVente, count)
+                with lock:
+                    allocated.extend(batch)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return allocated
+
+
+def _allocate_in_child(queue):
+    queue.put(_allocate_in_threads())
+
+
+# Worker threads and processes use their own connections: TransactionTestCase
+# commits the legacy code so they see it.
+class AllocateCodesTests(TransactionTestCase):
+    def setUp(self):
+        codes._blocks.clear()
+        agent = User.objects.create(nom='Agent', telephone='0710000000', role='agent')
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT last_value, is_called FROM {codes.sequence_name("CAF")}')
+            last_value, is_called = cursor.fetchone()
+        prochain_bloc = last_value + codes.BLOCK_SIZE if is_called else last_value
+        # Issued before the allocator, at random, and inside the next block.
+        self.legacy = f'CAF-{codes._encode(prochain_bloc + 5)}'
+        PointDeVente.objects.create(
+            code=self.legacy, nom='PDV', commune='Cocody', proprietaire_nom='Proprietaire', agent=agent,
+        )
+
+    def assertAllocated(self, allocated, expected):
+        self.assertEqual(len(allocated), expected)
+        self.assertEqual(len(set(allocated)), expected)
+        self.assertNotIn(self.legacy, allocated)
+        for code in allocated:
+            self.assertRegex(code, rf'^CAF-[{codes.CHARSET}]{{{codes.CODE_LENGTH}}}$')
+
+    def test_threads_get_distinct_codes(self):
+        self.assertAllocated(_allocate_in_threads(), 4 * 25 * 10)
+
+    def test_forked_processes_get_distinct_codes(self):
+        # The parent holds a partly used block when it forks: children must
+        # not hand out the rest of it.
+        parent = codes.allocate_codes('CAF', PointDeVente, 3)
+        connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        processes = [context.Process(target=_allocate_in_child, args=(queue,)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        allocated = parent + [code for _ in processes for code in queue.get(timeout=60)]
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        allocated += codes.allocate_codes('CAF', PointDeVente, 97)
+        self.assertAllocated(allocated, 3 + 4 * 4 * 25 * 10 + 97)
+
+
+@override_settings(PAGINATION_COUNT_STRATEGY='estimated', PAGINATION_ESTIMATE_THRESHOLD=0)
+class EstimatedCountPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        agent = User.objects.create(nom='Agent', telephone='0710000000', role='agent')
+        PointDeVente.objects.bulk_create(
+            PointDeVente(code=f'CAF-T{i:02d}', nom=f'PDV {i}', commune='Cocody', proprietaire_nom='P', agent=agent)
+            for i in range(25)
+        )
+
+    def paginator(self, estimate):
+        with mock.patch('core.pagination._estimate', return_value=estimate):
+            paginator = CAFPaginator(PointDeVente.objects.order_by('code'), 10)
+            paginator.count
+        self.assertFalse(paginator.count_exact)
+        return paginator
+
+    def test_pages_past_a_short_estimate_are_served(self):
+        paginator = self.paginator(estimate=5)
+        self.assertEqual(len(paginator.page(2)), 10)
+        self.assertEqual([p.code for p in paginator.page(3)], [f'CAF-T{i:02d}' for i in range(20, 25)])
+
+    def test_pages_past_the_rows_are_out_of_range(self):
+        paginator = self.paginator(estimate=1000)
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+        with self.assertRaises(EmptyPage):
+            paginator.page(0)
+
+
+class SyncBoundTests(TransactionTestCase):
+    def setUp(self):
+        self.agent = User.objects.create(nom='Agent', telephone='0710000000', role='agent')
+
+    def test_bound_waits_for_open_write_transactions(self):
+        ecrit, fin = threading.Event(), threading.Event()
+        debut = []
+
+        def writer():
+            try:
+                debut.append(timezone.now())
+                with transaction.atomic():
+                    User.objects.filter(pk=self.agent.pk).update(nom='Agent bis')
+                    ecrit.set()
+                    fin.wait(10)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            self.assertTrue(ecrit.wait(10))
+            time.sleep(0.2)
+            self.assertLess(sync._fin(), debut[0] - sync.MARGE + timedelta(seconds=0.1))
+        finally:
+            fin.set()
+            thread.join()
+        self.assertGreater(sync._fin(), timezone.now() - sync.MARGE - timedelta(seconds=1))
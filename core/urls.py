@@ -1,9 +1,11 @@
 from django.urls import path
 
-from core.views import CommissionUpdateView, ProfileUpdateView, SettingsView
+from core.views import CommissionUpdateView, DatabasePoolView, ProfileUpdateView, SettingsView, SyncView
 
 urlpatterns = [
     path('settings/', SettingsView.as_view(), name='settings'),
     path('settings/profile/', ProfileUpdateView.as_view(), name='settings-profile'),
     path('settings/commission/', CommissionUpdateView.as_view(), name='settings-commission'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('admin/db-pool/', DatabasePoolView.as_view(), name='admin-db-pool'),
 ]
@@ -1,7 +1,9 @@
-import random
 import re
+from datetime import date, datetime, time, timedelta
 
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
 
 CHARSET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
 
@@ -12,8 +14,91 @@ phone_validator = RegexValidator(
 
 
 def generate_code(prefix, model_class, field='code'):
-    """Generate a unique code like CAF-A7B3K9 or REC-M2N4P6."""
-    while True:
-        code = prefix + '-' + ''.join(random.choices(CHARSET, k=6))
-        if not model_class.objects.filter(**{field: code}).exists():
-            return code
+    """Allocate a unique code like CAF-A7B3K9 or REC-M2N4P6 (see ``core.codes``)."""
+    return generate_codes(prefix, model_class, 1, field)[0]
+
+
+def generate_codes(prefix, model_class, count, field='code'):
+    from core.codes import allocate_codes
+
+    return allocate_codes(prefix, model_class, count, field)
+
+
+def parse_date_range(params):
+    """Read ``startDate``/``endDate`` (YYYY-MM-DD) as dates; either may be None."""
+    bornes = []
+    for key in ('startDate', 'endDate'):
+        value = params.get(key)
+        if not value:
+            bornes.append(None)
+            continue
+        try:
+            bornes.append(date.fromisoformat(value))
+        except ValueError:
+            raise ValidationError({key: 'Date invalide, format attendu YYYY-MM-DD.'})
+    return tuple(bornes)
+
+
+def parse_fields(params, available, expandable=()):
+    """Fields selected by ``fields=a,b`` and ``expand=c``, in ``available`` order.
+
+    Without ``fields`` every field of ``available`` is kept. ``expandable``
+    fields are also accepted in ``expand``; unknown names are a 400.
+    """
+    selected = set()
+    for key, choices in (('fields', available), ('expand', expandable)):
+        names = {name.strip() for name in params.get(key, '').split(',') if name.strip()}
+        unknown = names - set(choices)
+        if unknown:
+            raise ValidationError({key: f"Champs inconnus : {', '.join(sorted(unknown))}."})
+        selected |= names
+    if not params.get('fields', '').strip():
+        return list(available)
+    return [field for field in available if field in selected]
+
+
+def _shift_year(day, years=-1):
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:  # 29 fevrier
+        return day.replace(year=day.year + years, day=28)
+
+
+def comparison_windows(params):
+    """``((start, end), (prev_start, prev_end))`` for ``compareTo``, or None without it.
+
+    ``previous`` is the window of the same length just before; ``lastYear``
+    is the same calendar dates one year earlier.
+    """
+    compare_to = params.get('compareTo')
+    if not compare_to:
+        return None
+    if compare_to not in ('previous', 'lastYear'):
+        raise ValidationError({'compareTo': 'compareTo doit etre previous ou lastYear.'})
+    start, end = parse_date_range(params)
+    if not start or not end or start > end:
+        raise ValidationError({'compareTo': 'startDate et endDate sont requis pour comparer deux periodes.'})
+    if compare_to == 'previous':
+        length = end - start + timedelta(days=1)
+        return (start, end), (start - length, end - length)
+    return (start, end), (_shift_year(start), _shift_year(end))
+
+
+def day_start(day):
+    """Aware start of ``day`` in the business time zone (Africa/Abidjan)."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_date_range(qs, params, field='created_at'):
+    """Filter ``qs`` on ``startDate``/``endDate`` as a half-open timestamp range.
+
+    Comparing the raw column against ``[start 00:00, end+1 00:00)`` keeps the
+    b-tree indexes on ``field`` usable, unlike ``field__date`` lookups which
+    wrap the column in a cast.
+    """
+    start, end = parse_date_range(params)
+    if start:
+        qs = qs.filter(**{f'{field}__gte': day_start(start)})
+    if end:
+        qs = qs.filter(**{f'{field}__lt': day_start(end + timedelta(days=1))})
+    return qs
@@ -1,11 +1,12 @@
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from core.exceptions import ConflictError
 from core.models import Settings
-from core.permissions import IsAdmin, IsAdminOrAgent
+from core.permissions import IsAdmin, IsAdminOrAgent, IsAgent
 from core.serializers import (
     CommissionUpdateSerializer,
     ProfileUpdateSerializer,
@@ -29,9 +30,13 @@ class ProfileUpdateView(APIView):
 
     @extend_schema(tags=['Settings'], summary='Modifier le profil', request=ProfileUpdateSerializer)
     def patch(self, request):
+        from accounts.authentication import invalidate_user
+        from accounts.models import User
+
         serializer = ProfileUpdateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = request.user
+        # request.user only carries the authentication fields.
+        user = User.objects.get(pk=request.user.pk)
         data = serializer.validated_data
 
         if 'nom' in data:
@@ -39,7 +44,6 @@ class ProfileUpdateView(APIView):
 
         if 'telephone' in data:
             phone_validator(data['telephone'])
-            from accounts.models import User
             if User.objects.filter(telephone=data['telephone']).exclude(id=user.id).exists():
                 raise ConflictError('Ce numero de telephone est deja utilise.')
             user.telephone = data['telephone']
@@ -49,6 +53,7 @@ class ProfileUpdateView(APIView):
             user.set_password(mot_de_passe)
 
         user.save()
+        invalidate_user(user.id)
 
         from accounts.serializers import UserReadSerializer
         return Response(UserReadSerializer(user).data)
@@ -67,3 +72,42 @@ class CommissionUpdateView(APIView):
         settings.save()
 
         return Response(SettingsSerializer(settings).data)
+
+
+class SyncView(APIView):
+    permission_classes = [IsAgent]
+
+    @extend_schema(
+        tags=['Sync'], summary='Modifications depuis la derniere synchronisation',
+        description='Renvoie les PDV, recouvrements et parametres modifies depuis le watermark, '
+                    'puis un nouveau watermark. Rappeler tant que hasMore est vrai ; '
+                    'pdvIds liste tous les PDV encore visibles.',
+        parameters=[
+            OpenApiParameter('watermark', str, description='Watermark de la synchronisation precedente (vide la premiere fois)'),
+            OpenApiParameter('limit', int, description='Nombre max de PDV et de recouvrements par appel (defaut 500, max 1000)'),
+        ],
+    )
+    def get(self, request):
+        from core import sync
+
+        try:
+            limite = int(request.query_params.get('limit', sync.LIMITE))
+        except ValueError:
+            limite = 0
+        if not 1 <= limite <= sync.LIMITE_MAX:
+            raise ValidationError({'limit': f'limit doit etre entre 1 et {sync.LIMITE_MAX}.'})
+        return Response(sync.changes(request.user, request.query_params.get('watermark'), limite))
+
+
+class DatabasePoolView(APIView):
+    permission_classes = [IsAdmin]
+
+    @extend_schema(
+        tags=['Stats'], summary='Etat du pool de connexions',
+        description='Compteurs du pool de connexions du processus qui repond (un pool par worker). '
+                    'pool vaut null si le pool est desactive (DB_POOL_MAX_SIZE=0).',
+    )
+    def get(self, request):
+        from core.db import pool_stats
+
+        return Response({'pool': pool_stats()})
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdv', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pointdevente',
+            index=models.Index(fields=['ville', 'commune'], name='points_de_v_ville_8e99e6_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdv', '0002_pointdevente_ville_commune_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pointdevente',
+            index=models.Index(fields=['agent', 'updated_at', 'id'], name='points_de_v_agent_i_d1d7a8_idx'),
+        ),
+    ]
@@ -32,6 +32,9 @@ class PointDeVente(models.Model):
             models.Index(fields=['agent']),
             models.Index(fields=['status']),
             models.Index(fields=['commune']),
+            models.Index(fields=['ville', 'commune']),
+            # Delta sync seeks on (updated_at, id) within an agent's PDVs.
+            models.Index(fields=['agent', 'updated_at', 'id']),
         ]
 
     def __str__(self):
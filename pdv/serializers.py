@@ -3,6 +3,23 @@ from rest_framework import serializers
 from pdv.models import PointDeVente
 
 
+# Model fields read by each PDVListSerializer field, for ``.only()``.
+PDV_COLUMNS = {
+    'id': ('id',),
+    'code': ('code',),
+    'nom': ('nom',),
+    'adresse': ('adresse',),
+    'ville': ('ville',),
+    'commune': ('commune',),
+    'proprietaireNom': ('proprietaire_nom',),
+    'proprietaireTelephone': ('proprietaire_telephone',),
+    'status': ('status',),
+    'agentId': ('agent_id',),
+    'agentNom': ('agent__nom',),
+    'createdAt': ('created_at',),
+}
+
+
 class PDVListSerializer(serializers.ModelSerializer):
     proprietaireNom = serializers.CharField(source='proprietaire_nom', read_only=True)
     proprietaireTelephone = serializers.CharField(source='proprietaire_telephone', read_only=True)
@@ -18,6 +35,12 @@ class PDVListSerializer(serializers.ModelSerializer):
             'agentId', 'agentNom', 'createdAt',
         ]
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 
 class PDVCreateSerializer(serializers.Serializer):
     nom = serializers.CharField(max_length=255)
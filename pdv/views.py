@@ -1,26 +1,33 @@
-from django.db.models import Q
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from core.cache import bump_data_version
 from core.pagination import CAFPagination
 from core.permissions import IsAdmin, IsAdminOrAgent
-from core.utils import generate_code
+from core.search import search
+from core.utils import generate_code, parse_fields
 from pdv.models import PointDeVente
-from pdv.serializers import PDVCreateSerializer, PDVListSerializer, PDVUpdateSerializer
+from pdv.serializers import PDV_COLUMNS, PDVCreateSerializer, PDVListSerializer, PDVUpdateSerializer
 
 
 @extend_schema_view(
     list=extend_schema(
         tags=['PDV'], summary='Lister les points de vente',
         parameters=[
-            OpenApiParameter('search', str, description='Recherche par nom, code, proprietaire'),
+            OpenApiParameter('search', str, description='Recherche par nom, code, proprietaire (triee par pertinence)'),
             OpenApiParameter('status', str, description='Filtrer par statut (ACTIF/EN_ATTENTE/INACTIF)'),
             OpenApiParameter('agentId', str, description='Filtrer par agent'),
+            OpenApiParameter('fields', str, description='Champs a renvoyer, separes par des virgules (defaut : tous)'),
+        ],
+    ),
+    retrieve=extend_schema(
+        tags=['PDV'], summary='Detail point de vente',
+        parameters=[
+            OpenApiParameter('fields', str, description='Champs a renvoyer, separes par des virgules (defaut : tous)'),
         ],
     ),
-    retrieve=extend_schema(tags=['PDV'], summary='Detail point de vente'),
     create=extend_schema(tags=['PDV'], summary='Creer un point de vente', request=PDVCreateSerializer, responses={201: PDVListSerializer}),
     partial_update=extend_schema(tags=['PDV'], summary='Modifier un point de vente', request=PDVUpdateSerializer, responses={200: PDVListSerializer}),
     destroy=extend_schema(tags=['PDV'], summary='Supprimer un point de vente'),
@@ -37,8 +44,18 @@ class PDVViewSet(ViewSet):
             qs = qs.filter(agent_id=request.user.id)
         return qs
 
+    def get_fields(self, request):
+        return parse_fields(request.query_params, list(PDV_COLUMNS))
+
+    def select_fields(self, qs, fields):
+        """Restrict ``qs`` to the columns ``fields`` are read from; join the agent only for its name."""
+        if 'agentNom' not in fields:
+            qs = qs.select_related(None)
+        return qs.only(*[column for field in fields for column in PDV_COLUMNS[field]])
+
     def list(self, request):
-        qs = self.get_queryset(request)
+        fields = self.get_fields(request)
+        qs = self.select_fields(self.get_queryset(request), fields)
 
         pdv_status = request.query_params.get('status')
         if pdv_status:
@@ -52,28 +69,25 @@ class PDVViewSet(ViewSet):
         if commune:
             qs = qs.filter(commune=commune)
 
-        search = request.query_params.get('search')
-        if search:
-            qs = qs.filter(
-                Q(nom__icontains=search)
-                | Q(code__icontains=search)
-                | Q(proprietaire_nom__icontains=search)
-            )
+        term = request.query_params.get('search')
+        if term:
+            qs = search(qs, term, ['nom', 'code', 'proprietaire_nom']).order_by('-pertinence', '-created_at')
 
         paginator = CAFPagination()
         page = paginator.paginate_queryset(qs, request)
-        serializer = PDVListSerializer(page, many=True)
+        serializer = PDVListSerializer(page, many=True, fields=fields)
         return paginator.get_paginated_response(serializer.data)
 
     def retrieve(self, request, pk=None):
+        fields = self.get_fields(request)
         try:
-            pdv = self.get_queryset(request).get(pk=pk)
+            pdv = self.select_fields(self.get_queryset(request), fields).get(pk=pk)
         except (PointDeVente.DoesNotExist, ValueError):
             return Response(
                 {'error': {'code': 'NOT_FOUND', 'message': 'Point de vente introuvable'}},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        return Response(PDVListSerializer(pdv).data)
+        return Response(PDVListSerializer(pdv, fields=fields).data)
 
     def create(self, request):
         serializer = PDVCreateSerializer(data=request.data)
@@ -105,6 +119,7 @@ class PDVViewSet(ViewSet):
             status=pdv_status,
             agent_id=agent_id,
         )
+        bump_data_version()
         pdv = PointDeVente.objects.select_related('agent').get(pk=pdv.pk)
         return Response(PDVListSerializer(pdv).data, status=status.HTTP_201_CREATED)
 
@@ -138,6 +153,7 @@ class PDVViewSet(ViewSet):
             pdv.agent_id = data['agentId']
 
         pdv.save()
+        bump_data_version()
         pdv.refresh_from_db()
         pdv = PointDeVente.objects.select_related('agent').get(pk=pdv.pk)
         return Response(PDVListSerializer(pdv).data)
@@ -159,4 +175,5 @@ class PDVViewSet(ViewSet):
             )
 
         pdv.delete()
+        bump_data_version()
         return Response({'message': 'Point de vente supprime'})
@@ -0,0 +1,72 @@
+"""Revenue broken down by zone, ville, commune and point de vente.
+
+Geography is read from the current ``points_de_vente`` row and its agent's
+``zone``, so a PDV moved to another commune is reported under its new
+commune. The daily rollups are first summed per PDV for the requested
+period, then joined to every PDV: places with no activity still appear
+with zero totals alongside their active-PDV count.
+"""
+from django.db import connection
+
+from core.utils import parse_date_range
+
+NIVEAUX = {
+    'zone': ['u.zone'],
+    'ville': ['p.ville'],
+    'commune': ['p.ville', 'p.commune'],
+    'pdv': ['p.id', 'p.code', 'p.nom', 'p.ville', 'p.commune', 'u.zone', 'p.status'],
+}
+
+# Drill-down filters accepted at every level.
+FILTRES = {'zone': 'u.zone', 'ville': 'p.ville', 'commune': 'p.commune'}
+
+_SQL = """
+SELECT {colonnes},
+       COALESCE(SUM(a.nombre), 0)::bigint,
+       COALESCE(SUM(a.montant), 0)::bigint,
+       COALESCE(SUM(a.commission), 0)::bigint,
+       COUNT(*) FILTER (WHERE p.status = 'ACTIF')
+FROM points_de_vente p
+JOIN users u ON u.id = p.agent_id
+LEFT JOIN (
+    SELECT point_de_vente_id,
+           SUM(nombre) AS nombre, SUM(montant) AS montant, SUM(commission) AS commission
+    FROM agregats_journaliers
+    WHERE {periode}
+    GROUP BY point_de_vente_id
+) a ON a.point_de_vente_id = p.id
+WHERE {filtres}
+GROUP BY {colonnes}
+ORDER BY {tri} DESC, {colonnes}
+"""
+
+
+def repartition(niveau, params):
+    """Rows ``(*colonnes, total, montant, commission, pdv_actifs)`` for ``niveau``."""
+    colonnes = NIVEAUX[niveau]
+    start, end = parse_date_range(params)
+    valeurs = {}
+
+    periode = ['TRUE']
+    if start:
+        periode.append('jour >= %(start)s')
+        valeurs['start'] = start
+    if end:
+        periode.append('jour <= %(end)s')
+        valeurs['end'] = end
+
+    filtres = ['TRUE']
+    for key, colonne in FILTRES.items():
+        if params.get(key):
+            filtres.append(f'{colonne} = %({key})s')
+            valeurs[key] = params[key]
+
+    sql = _SQL.format(
+        colonnes=', '.join(colonnes),
+        periode=' AND '.join(periode),
+        filtres=' AND '.join(filtres),
+        tri=len(colonnes) + 2,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, valeurs)
+        return cursor.fetchall()
@@ -0,0 +1,94 @@
+"""Database-backed queue for background report jobs.
+
+Jobs are rows in ``rapport_jobs``; workers (``manage.py run_report_worker``)
+claim them with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several workers can
+share the queue, then run the same ``compute`` the synchronous views use.
+
+A running job holds a lease (``lease_expires_at``) that its worker extends
+every third of ``LEASE`` while it computes. Only a job whose lease has run
+out, i.e. whose worker died or hung, is put back in the queue.
+"""
+import threading
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.enums import RapportJobStatus, RapportType
+from rapports.models import RapportJob
+from rapports.views import (
+    ParCategorieView,
+    ParJourView,
+    ParMethodeView,
+    SummaryView,
+    TopAgentsView,
+    TopPDVsView,
+)
+
+REPORT_VIEWS = {
+    RapportType.SUMMARY: SummaryView,
+    RapportType.PAR_JOUR: ParJourView,
+    RapportType.PAR_CATEGORIE: ParCategorieView,
+    RapportType.PAR_METHODE: ParMethodeView,
+    RapportType.TOP_AGENTS: TopAgentsView,
+    RapportType.TOP_PDVS: TopPDVsView,
+}
+
+LEASE = timedelta(minutes=1)
+
+
+def claim_next_job(lease=LEASE):
+    """Mark the oldest pending job as running and return it (or None)."""
+    with transaction.atomic():
+        job = (
+            RapportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=RapportJobStatus.EN_ATTENTE)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = RapportJobStatus.EN_COURS
+        job.started_at = timezone.now()
+        job.lease_expires_at = job.started_at + lease
+        job.save(update_fields=['status', 'started_at', 'lease_expires_at'])
+    return job
+
+
+def _renew_lease(job, lease, stop):
+    try:
+        while not stop.wait(lease.total_seconds() / 3):
+            RapportJob.objects.filter(pk=job.pk, status=RapportJobStatus.EN_COURS).update(
+                lease_expires_at=timezone.now() + lease,
+            )
+    finally:
+        connection.close()
+
+
+def run_job(job, lease=LEASE):
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_renew_lease, args=(job, lease, stop), daemon=True)
+    heartbeat.start()
+    try:
+        result = REPORT_VIEWS[job.type]().compute(job.params)
+    except Exception as exc:
+        job.status = RapportJobStatus.ECHOUE
+        job.error = str(exc)
+    else:
+        job.status = RapportJobStatus.TERMINE
+        job.result = result
+    finally:
+        stop.set()
+        heartbeat.join()
+    job.finished_at = timezone.now()
+    job.lease_expires_at = None
+    job.save(update_fields=['status', 'result', 'error', 'finished_at', 'lease_expires_at'])
+    return job
+
+
+def requeue_stale_jobs():
+    """Put back running jobs whose lease has expired."""
+    return RapportJob.objects.filter(
+        status=RapportJobStatus.EN_COURS,
+        lease_expires_at__lt=timezone.now(),
+    ).update(status=RapportJobStatus.EN_ATTENTE, started_at=None, lease_expires_at=None)
@@ -0,0 +1,42 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.fanout import run_concurrently
+from rapports.views import _admin_stats_queries
+
+
+class Command(BaseCommand):
+    help = 'Compare sequential and concurrent execution of the admin dashboard statements'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--granularity', default='day', choices=['hour', 'day', 'week', 'month'])
+
+    def handle(self, *args, **options):
+        queries = _admin_stats_queries(options['granularity'])
+        if [query() for query in queries] != run_concurrently(*queries):
+            raise CommandError('Sequential and concurrent results differ')
+
+        par_requete = [[] for _ in queries]
+        sequentiel, concurrent = [], []
+        for _ in range(options['iterations']):
+            start = time.perf_counter()
+            for i, query in enumerate(queries):
+                debut = time.perf_counter()
+                query()
+                par_requete[i].append((time.perf_counter() - debut) * 1000)
+            sequentiel.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            run_concurrently(*queries)
+            concurrent.append((time.perf_counter() - start) * 1000)
+
+        medianes = [statistics.median(runs) for runs in par_requete]
+        self.stdout.write('statements: ' + ', '.join(f'{m:.2f}' for m in medianes) + ' ms')
+        self.stdout.write(
+            f'sequential {statistics.median(sequentiel):.2f} ms (sum), '
+            f'concurrent {statistics.median(concurrent):.2f} ms, '
+            f'slowest statement {max(medianes):.2f} ms'
+        )
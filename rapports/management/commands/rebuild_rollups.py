@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from rapports import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the report rollup tables from the recouvrements tables'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding rollups...')
+        journaliers, categories = rollups.rebuild()
+        self.stdout.write(f'  {journaliers} daily rows')
+        self.stdout.write(f'  {categories} daily categorie rows')
+        self.stdout.write(self.style.SUCCESS('Rollups rebuilt!'))
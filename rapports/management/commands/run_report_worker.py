@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from rapports import jobs
+
+
+class Command(BaseCommand):
+    help = 'Run background report jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue then exit')
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument(
+            '--lease', type=int, default=int(jobs.LEASE.total_seconds()),
+            help='Seconds a running job stays claimed without a heartbeat before it is requeued',
+        )
+
+    def handle(self, *args, **options):
+        lease = timedelta(seconds=options['lease'])
+        self.stdout.write('Report worker started')
+        while True:
+            close_old_connections()
+            requeued = jobs.requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'  Requeued {requeued} stale jobs'))
+
+            job = jobs.claim_next_job(lease)
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+
+            started = time.monotonic()
+            job = jobs.run_job(job, lease)
+            self.stdout.write(
+                f'  {job.id} {job.type} {job.status} in {time.monotonic() - started:.2f}s'
+            )
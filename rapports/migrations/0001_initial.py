@@ -0,0 +1,68 @@
+# Generated by Django 5.1.5 on 2026-10-17 22:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill(apps, schema_editor):
+    Recouvrement = apps.get_model('recouvrements', 'Recouvrement')
+    AgregatJournalier = apps.get_model('rapports', 'AgregatJournalier')
+    rows = (
+        Recouvrement.objects.order_by()
+        .annotate(jour=TruncDate('created_at'))
+        .values('jour', 'agent_id', 'point_de_vente_id', 'methode_paiement', 'status')
+        .annotate(n=Count('id'), m=Sum('montant'), c=Sum('commission'))
+    )
+    AgregatJournalier.objects.bulk_create(
+        [
+            AgregatJournalier(
+                jour=row['jour'],
+                agent_id=row['agent_id'],
+                point_de_vente_id=row['point_de_vente_id'],
+                methode_paiement=row['methode_paiement'],
+                status=row['status'],
+                nombre=row['n'],
+                montant=row['m'],
+                commission=row['c'],
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('pdv', '0001_initial'),
+        ('recouvrements', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgregatJournalier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField()),
+                ('methode_paiement', models.CharField(choices=[('MTN_MOMO', 'MTN MoMo'), ('ORANGE_MONEY', 'Orange Money'), ('ESPECES', 'Especes')], max_length=15)),
+                ('status', models.CharField(choices=[('EN_ATTENTE', 'En attente'), ('VALIDE', 'Valide'), ('REJETE', 'Rejete')], max_length=15)),
+                ('nombre', models.IntegerField(default=0)),
+                ('montant', models.BigIntegerField(default=0)),
+                ('commission', models.BigIntegerField(default=0)),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('point_de_vente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pdv.pointdevente')),
+            ],
+            options={
+                'db_table': 'agregats_journaliers',
+                'indexes': [models.Index(fields=['jour'], name='agregats_jo_jour_5ee4e8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('jour', 'agent', 'point_de_vente', 'methode_paiement', 'status'), name='agregats_journaliers_cle_unique')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
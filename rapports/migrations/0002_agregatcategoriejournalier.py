@@ -0,0 +1,54 @@
+# Generated by Django 5.1.5 on 2026-10-17 22:54
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill(apps, schema_editor):
+    LigneRecouvrement = apps.get_model('recouvrements', 'LigneRecouvrement')
+    AgregatCategorieJournalier = apps.get_model('rapports', 'AgregatCategorieJournalier')
+    rows = (
+        LigneRecouvrement.objects.order_by()
+        .annotate(jour=TruncDate('recouvrement__created_at'))
+        .values('jour', 'categorie')
+        .annotate(q=Sum('quantite'), m=Sum('sous_total'))
+    )
+    AgregatCategorieJournalier.objects.bulk_create(
+        [
+            AgregatCategorieJournalier(
+                jour=row['jour'],
+                categorie=row['categorie'],
+                quantite=row['q'],
+                montant=row['m'],
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rapports', '0001_initial'),
+        ('recouvrements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgregatCategorieJournalier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField()),
+                ('categorie', models.CharField(choices=[('BOISSONS', 'Boissons'), ('ALIMENTATION', 'Alimentation'), ('HABILLEMENT', 'Habillement'), ('ELECTRONIQUE', 'Electronique'), ('AUTRE', 'Autre')], max_length=15)),
+                ('quantite', models.BigIntegerField(default=0)),
+                ('montant', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'agregats_categories_journaliers',
+                'constraints': [models.UniqueConstraint(fields=('jour', 'categorie'), name='agregats_categories_cle_unique')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
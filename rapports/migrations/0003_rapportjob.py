@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:01
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rapports', '0002_agregatcategoriejournalier'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RapportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('summary', 'Resume global'), ('par-jour', 'Revenus par jour'), ('par-categorie', 'Ventes par categorie'), ('par-methode', 'Repartition par methode de paiement'), ('top-agents', 'Top agents par montant'), ('top-pdvs', 'Top points de vente par montant')], max_length=20)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('EN_ATTENTE', 'En attente'), ('EN_COURS', 'En cours'), ('TERMINE', 'Termine'), ('ECHOUE', 'Echoue')], default='EN_ATTENTE', max_length=15)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rapport_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'rapport_jobs',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='rapport_job_status_22a1a0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rapports', '0003_rapportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rapportjob',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
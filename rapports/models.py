@@ -0,0 +1,94 @@
+import uuid
+
+from django.db import models
+
+from core.enums import (
+    CategorieProduit,
+    MethodePaiement,
+    RapportJobStatus,
+    RapportType,
+    RecouvrementStatus,
+)
+
+
+class AgregatJournalier(models.Model):
+    """Rollup of recouvrements per business day, agent, PDV, methode and status."""
+
+    jour = models.DateField()
+    agent = models.ForeignKey(
+        'accounts.User', on_delete=models.CASCADE, related_name='+',
+    )
+    point_de_vente = models.ForeignKey(
+        'pdv.PointDeVente', on_delete=models.CASCADE, related_name='+',
+    )
+    methode_paiement = models.CharField(max_length=15, choices=MethodePaiement.choices)
+    status = models.CharField(max_length=15, choices=RecouvrementStatus.choices)
+    nombre = models.IntegerField(default=0)
+    montant = models.BigIntegerField(default=0)
+    commission = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'agregats_journaliers'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['jour', 'agent', 'point_de_vente', 'methode_paiement', 'status'],
+                name='agregats_journaliers_cle_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['jour']),
+        ]
+
+    def __str__(self):
+        return f'{self.jour} {self.methode_paiement} {self.status} x{self.nombre}'
+
+
+class AgregatCategorieJournalier(models.Model):
+    """Rollup of recouvrement lines per business day and categorie."""
+
+    jour = models.DateField()
+    categorie = models.CharField(max_length=15, choices=CategorieProduit.choices)
+    quantite = models.BigIntegerField(default=0)
+    montant = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'agregats_categories_journaliers'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['jour', 'categorie'],
+                name='agregats_categories_cle_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.jour} {self.categorie} x{self.quantite}'
+
+
+class RapportJob(models.Model):
+    """A report computed in the background by ``run_report_worker``."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    type = models.CharField(max_length=20, choices=RapportType.choices)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=15, choices=RapportJobStatus.choices, default=RapportJobStatus.EN_ATTENTE,
+    )
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    created_by = models.ForeignKey(
+        'accounts.User', on_delete=models.CASCADE, related_name='rapport_jobs',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # Extended by the running worker; a job past its lease is requeued.
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'rapport_jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.type} ({self.status})'
@@ -0,0 +1,153 @@
+"""Incremental maintenance of the report rollup tables.
+
+The write paths call these helpers inside their own transaction so the
+rollups never drift from the ``recouvrements`` table. ``rebuild()`` recomputes
+everything from scratch (see the ``rebuild_rollups`` command).
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.cache import bump_data_version
+from rapports.models import AgregatCategorieJournalier, AgregatJournalier
+
+_CLE = ('jour', 'agent_id', 'point_de_vente_id', 'methode_paiement', 'status')
+_VALEURS = ('nombre', 'montant', 'commission')
+_CLE_CATEGORIE = ('jour', 'categorie')
+_VALEURS_CATEGORIE = ('quantite', 'montant')
+_BATCH = 2000
+
+
+def _cle(rec, status=None):
+    return (
+        timezone.localdate(rec.created_at),
+        rec.agent_id,
+        rec.point_de_vente_id,
+        rec.methode_paiement,
+        status or rec.status,
+    )
+
+
+def _upsert(model, cle, valeurs, deltas):
+    """Add ``deltas`` ({cle: [valeurs...]}) to the rollup table of ``model``.
+
+    Rows are written, hence locked until commit, in key order: transactions
+    touching the same keys queue up instead of deadlocking. The category
+    rollup has one row per ``(jour, categorie)``, so every create of the day
+    waits on those rows until the creating transaction commits.
+    """
+    rows = [k + tuple(v) for k, v in sorted(deltas.items()) if any(v)]
+    if not rows:
+        return
+    table = model._meta.db_table
+    colonnes = ', '.join(cle + valeurs)
+    placeholders = ', '.join(['(' + ', '.join(['%s'] * len(rows[0])) + ')'] * len(rows))
+    updates = ', '.join(f'{v} = {table}.{v} + EXCLUDED.{v}' for v in valeurs)
+    sql = (
+        f'INSERT INTO {table} ({colonnes}) VALUES {placeholders} '
+        f'ON CONFLICT ({", ".join(cle)}) DO UPDATE SET {updates}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [v for row in rows for v in row])
+
+
+def record_created(recouvrements):
+    """Count newly inserted recouvrements in the rollup."""
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for rec in recouvrements:
+        d = deltas[_cle(rec)]
+        d[0] += 1
+        d[1] += rec.montant
+        d[2] += rec.commission
+    _upsert(AgregatJournalier, _CLE, _VALEURS, deltas)
+
+
+def record_lignes(lignes):
+    """Count newly inserted lines in the category rollup.
+
+    Each ligne must carry its (already saved) ``recouvrement``.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for ligne in lignes:
+        d = deltas[(timezone.localdate(ligne.recouvrement.created_at), ligne.categorie)]
+        d[0] += ligne.quantite
+        d[1] += ligne.sous_total
+    _upsert(AgregatCategorieJournalier, _CLE_CATEGORIE, _VALEURS_CATEGORIE, deltas)
+
+
+def record_status_change(rec, ancien_status):
+    """Move one recouvrement from its ``ancien_status`` bucket to its current one."""
+    record_status_changes([rec], ancien_status)
+
+
+def record_status_changes(recouvrements, ancien_status):
+    """Move recouvrements that all left ``ancien_status`` to their current status."""
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for rec in recouvrements:
+        if ancien_status == rec.status:
+            continue
+        for cle, signe in ((_cle(rec, ancien_status), -1), (_cle(rec), 1)):
+            d = deltas[cle]
+            d[0] += signe
+            d[1] += signe * rec.montant
+            d[2] += signe * rec.commission
+    _upsert(AgregatJournalier, _CLE, _VALEURS, deltas)
+
+
+def _reload(model, rows, build):
+    model.objects.all().delete()
+    batch = []
+    total = 0
+    for row in rows.iterator(chunk_size=_BATCH):
+        batch.append(build(row))
+        if len(batch) >= _BATCH:
+            model.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+    return total + len(batch)
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute the rollups from the recouvrements tables.
+
+    Returns the row counts as ``(journaliers, categories)``.
+    """
+    from recouvrements.models import LigneRecouvrement, Recouvrement
+
+    journaliers = _reload(
+        AgregatJournalier,
+        Recouvrement.objects.order_by()
+        .annotate(jour=TruncDate('created_at'))
+        .values(*_CLE)
+        .annotate(n=Count('id'), m=Sum('montant'), c=Sum('commission')),
+        lambda row: AgregatJournalier(
+            jour=row['jour'],
+            agent_id=row['agent_id'],
+            point_de_vente_id=row['point_de_vente_id'],
+            methode_paiement=row['methode_paiement'],
+            status=row['status'],
+            nombre=row['n'],
+            montant=row['m'],
+            commission=row['c'],
+        ),
+    )
+    categories = _reload(
+        AgregatCategorieJournalier,
+        LigneRecouvrement.objects.order_by()
+        .annotate(jour=TruncDate('recouvrement__created_at'))
+        .values(*_CLE_CATEGORIE)
+        .annotate(q=Sum('quantite'), m=Sum('sous_total')),
+        lambda row: AgregatCategorieJournalier(
+            jour=row['jour'],
+            categorie=row['categorie'],
+            quantite=row['q'],
+            montant=row['m'],
+        ),
+    )
+    bump_data_version()
+    return journaliers, categories
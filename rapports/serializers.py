@@ -0,0 +1,40 @@
+from rest_framework import serializers
+
+from core.enums import RapportType
+from core.utils import comparison_windows, parse_date_range
+from rapports import series
+from rapports.models import RapportJob
+
+
+class RapportJobCreateSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=RapportType.choices)
+    params = serializers.DictField(
+        child=serializers.CharField(allow_blank=True), required=False, default=dict,
+    )
+
+    def validate_params(self, value):
+        try:
+            parse_date_range(value)
+            comparison_windows(value)
+            series.parse_granularity(value)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError(
+                [f'{key}: {message}' for key, message in exc.detail.items()]
+            )
+        limit = value.get('limit')
+        if limit and not limit.isdigit():
+            raise serializers.ValidationError('limit doit etre un entier positif.')
+        return value
+
+
+class RapportJobSerializer(serializers.ModelSerializer):
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    startedAt = serializers.DateTimeField(source='started_at', read_only=True)
+    finishedAt = serializers.DateTimeField(source='finished_at', read_only=True)
+
+    class Meta:
+        model = RapportJob
+        fields = [
+            'id', 'type', 'params', 'status', 'result', 'error',
+            'createdAt', 'startedAt', 'finishedAt',
+        ]
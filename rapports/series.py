@@ -0,0 +1,107 @@
+"""Dense time series for the revenue charts.
+
+Buckets are generated and zero-filled in the database with
+``generate_series`` so the API always returns one entry per period.
+``day``/``week``/``month`` buckets are summed from the daily rollups;
+``hour`` buckets need timestamps and read ``recouvrements`` over the
+``created_at`` indexes, so their range is capped.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Min
+from rest_framework.exceptions import ValidationError
+
+from core.utils import day_start
+from rapports.models import AgregatJournalier
+
+GRANULARITES = ('hour', 'day', 'week', 'month')
+MAX_JOURS_HORAIRES = 31
+
+_LABELS = {
+    'hour': 'YYYY-MM-DD"T"HH24:00',
+    'day': 'YYYY-MM-DD',
+    'week': 'YYYY-MM-DD',
+    'month': 'YYYY-MM',
+}
+
+_SERIE_AGREGATS = """
+SELECT to_char(s.bucket, '{label}') AS periode,
+       COALESCE(a.montant, 0)::bigint AS montant,
+       COALESCE(a.count, 0)::bigint AS count
+FROM generate_series(
+    date_trunc('{unite}', %(debut)s::timestamp), %(fin)s::timestamp, interval '1 {unite}'
+) AS s(bucket)
+LEFT JOIN (
+    SELECT date_trunc('{unite}', jour::timestamp) AS bucket,
+           SUM(montant) AS montant, SUM(nombre) AS count
+    FROM agregats_journaliers
+    WHERE jour BETWEEN %(debut)s AND %(fin)s
+    GROUP BY 1
+) a USING (bucket)
+"""
+
+_SERIE_HORAIRE = """
+SELECT to_char(s.bucket, '{label}') AS periode,
+       COALESCE(r.montant, 0)::bigint AS montant,
+       COALESCE(r.count, 0)::bigint AS count
+FROM generate_series(
+    %(debut)s::timestamp, %(fin)s::timestamp + interval '23 hours', interval '1 hour'
+) AS s(bucket)
+LEFT JOIN (
+    SELECT date_trunc('hour', created_at AT TIME ZONE %(tz)s) AS bucket,
+           SUM(montant) AS montant, COUNT(*) AS count
+    FROM recouvrements
+    WHERE created_at >= %(debut_ts)s AND created_at < %(fin_ts)s
+    GROUP BY 1
+) r USING (bucket)
+"""
+
+
+def parse_granularity(params, default='day'):
+    granularite = params.get('granularity') or default
+    if granularite not in GRANULARITES:
+        raise ValidationError({'granularity': 'granularity doit etre hour, day, week ou month.'})
+    return granularite
+
+
+def series_sql(granularite):
+    """SELECT yielding ``(periode, montant, count)`` rows, one per bucket.
+
+    Meant to be run with :func:`series_params` or embedded as a CTE.
+    """
+    template = _SERIE_HORAIRE if granularite == 'hour' else _SERIE_AGREGATS
+    return template.format(unite=granularite, label=_LABELS[granularite])
+
+
+def series_params(granularite, debut, fin):
+    """Query parameters for the inclusive day range ``[debut, fin]``."""
+    params = {'debut': debut, 'fin': fin}
+    if granularite == 'hour':
+        if (fin - debut).days + 1 > MAX_JOURS_HORAIRES:
+            raise ValidationError({
+                'granularity': f'granularity=hour est limite a {MAX_JOURS_HORAIRES} jours.',
+            })
+        params.update(
+            tz=settings.TIME_ZONE,
+            debut_ts=day_start(debut),
+            fin_ts=day_start(fin + timedelta(days=1)),
+        )
+    return params
+
+
+def revenue_series(granularite, debut=None, fin=None):
+    """Dense ``[(periode, montant, count), ...]``; open bounds default to the data's range."""
+    if debut is None or fin is None:
+        bornes = AgregatJournalier.objects.aggregate(debut=Min('jour'), fin=Max('jour'))
+        debut = debut or bornes['debut']
+        fin = fin or bornes['fin']
+        if debut is None or fin is None:
+            return []
+    if debut > fin:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(series_sql(granularite) + 'ORDER BY s.bucket', series_params(granularite, debut, fin))
+        return cursor.fetchall()
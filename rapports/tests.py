@@ -0,0 +1,150 @@
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from core import fanout
+from core.enums import RapportJobStatus, RapportType
+from rapports import jobs
+from rapports.models import RapportJob
+from recouvrements.models import Recouvrement
+
+
+class FanoutQueries:
+    """Queries of the request thread and of the ``core.fanout`` worker threads.
+
+    Each worker thread has its own connection, so its queries are captured
+    there and added up.
+    """
+
+    def __enter__(self):
+        self.fanout_queries = []
+        lock = threading.Lock()
+        isolated = fanout._isolated
+
+        def counted(call):
+            def run():
+                with CaptureQueriesContext(connection) as context:
+                    result = call()
+                with lock:
+                    self.fanout_queries.extend(context.captured_queries)
+                return result
+            return isolated(run)
+
+        self._patch = mock.patch.object(fanout, '_isolated', counted)
+        self._patch.start()
+        self._request = CaptureQueriesContext(connection)
+        self._request.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._request.__exit__(*exc_info)
+        self._patch.stop()
+
+    @property
+    def request_queries(self):
+        return self._request.captured_queries
+
+
+# Sub-queries run on other connections: TransactionTestCase commits the data
+# so they see it.
+@override_settings(
+    BCRYPT_ROUNDS=4,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class StatsQueryBudgetTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        call_command('seed', '--no-input', stdout=StringIO())
+        self.client = APIClient()
+
+    def get(self, url, telephone):
+        self.client.force_authenticate(User.objects.get(telephone=telephone))
+        with FanoutQueries() as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), queries
+
+    def test_admin_stats_budget(self):
+        data, queries = self.get('/api/admin/stats/', '0700000001')
+
+        # One statement for every aggregate, one for the recent list, run
+        # concurrently; nothing left on the request thread.
+        self.assertEqual(len(queries.fanout_queries), 2)
+        self.assertEqual(len(queries.request_queries), 0)
+        self.assertEqual(data['totalRecouvrements'], Recouvrement.objects.count())
+        self.assertEqual(len(data['recentRecouvrements']), 5)
+
+    def test_admin_stats_budget_per_granularity(self):
+        for granularite in ('hour', 'week', 'month'):
+            with self.subTest(granularity=granularite):
+                _, queries = self.get(f'/api/admin/stats/?granularity={granularite}', '0700000001')
+                self.assertEqual(len(queries.fanout_queries), 2)
+                self.assertEqual(len(queries.request_queries), 0)
+
+    def test_agent_stats_budget(self):
+        data, queries = self.get('/api/agent/stats/', '0700000010')
+
+        self.assertEqual(len(queries.fanout_queries), 3)
+        self.assertEqual(len(queries.request_queries), 0)
+        agent = User.objects.get(telephone='0700000010')
+        self.assertEqual(data['totalRecouvrements'], Recouvrement.objects.filter(agent=agent).count())
+
+    def test_summary_budget(self):
+        _, queries = self.get('/api/rapports/summary/', '0700000001')
+
+        self.assertEqual(len(queries.fanout_queries), 3)
+        self.assertEqual(len(queries.request_queries), 0)
+
+    def test_cached_response_runs_no_query(self):
+        self.get('/api/admin/stats/', '0700000001')
+        _, queries = self.get('/api/admin/stats/', '0700000001')
+
+        self.assertEqual(len(queries.fanout_queries), 0)
+        self.assertEqual(len(queries.request_queries), 0)
+
+
+# The heartbeat renews the lease on its own connection.
+class RapportJobLeaseTests(TransactionTestCase):
+    lease = timedelta(seconds=0.3)
+
+    def setUp(self):
+        admin = User.objects.create(nom='Admin', telephone='0710000000', role='admin')
+        self.job = RapportJob.objects.create(type=RapportType.SUMMARY, created_by=admin)
+
+    def test_running_job_is_not_requeued(self):
+        requeued = []
+
+        class SlowView:
+            def compute(view, params):
+                time.sleep(self.lease.total_seconds() * 3)
+                requeued.append(jobs.requeue_stale_jobs())
+                return {}
+
+        job = jobs.claim_next_job(self.lease)
+        with mock.patch.dict(jobs.REPORT_VIEWS, {RapportType.SUMMARY: SlowView}):
+            jobs.run_job(job, self.lease)
+
+        self.assertEqual(requeued, [0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, RapportJobStatus.TERMINE)
+        self.assertIsNone(job.lease_expires_at)
+
+    def test_job_past_its_lease_is_requeued(self):
+        jobs.claim_next_job(self.lease)
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+
+        time.sleep(self.lease.total_seconds() * 1.5)
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, RapportJobStatus.EN_ATTENTE)
+        self.assertEqual(jobs.claim_next_job(self.lease), self.job)
@@ -4,8 +4,14 @@ from rapports.views import (
     AdminStatsView,
     AgentStatsView,
     ParCategorieView,
+    ParCommuneView,
     ParJourView,
     ParMethodeView,
+    ParPDVView,
+    ParVilleView,
+    ParZoneView,
+    RapportJobDetailView,
+    RapportJobListView,
     SummaryView,
     TopAgentsView,
     TopPDVsView,
@@ -18,6 +24,12 @@ urlpatterns = [
     path('rapports/par-methode/', ParMethodeView.as_view(), name='rapports-par-methode'),
     path('rapports/top-agents/', TopAgentsView.as_view(), name='rapports-top-agents'),
     path('rapports/top-pdvs/', TopPDVsView.as_view(), name='rapports-top-pdvs'),
+    path('rapports/par-zone/', ParZoneView.as_view(), name='rapports-par-zone'),
+    path('rapports/par-ville/', ParVilleView.as_view(), name='rapports-par-ville'),
+    path('rapports/par-commune/', ParCommuneView.as_view(), name='rapports-par-commune'),
+    path('rapports/par-pdv/', ParPDVView.as_view(), name='rapports-par-pdv'),
+    path('rapports/jobs/', RapportJobListView.as_view(), name='rapports-jobs'),
+    path('rapports/jobs/<str:pk>/', RapportJobDetailView.as_view(), name='rapports-job-detail'),
     path('admin/stats/', AdminStatsView.as_view(), name='admin-stats'),
     path('agent/stats/', AgentStatsView.as_view(), name='agent-stats'),
 ]
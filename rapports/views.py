@@ -1,17 +1,26 @@
 from datetime import timedelta
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection
 from django.db.models import Count, Q, Sum
-from django.db.models.functions import TruncDate
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import serializers as drf_serializers
+from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounts.models import User
+from core.cache import cached_report
+from core.fanout import run_concurrently
 from core.permissions import IsAdmin, IsAgent
+from core.utils import comparison_windows, parse_date_range
 from pdv.models import PointDeVente
-from recouvrements.models import LigneRecouvrement, Recouvrement
+from rapports import geographie, series
+from rapports.models import AgregatCategorieJournalier, AgregatJournalier, RapportJob
+from rapports.serializers import RapportJobCreateSerializer, RapportJobSerializer
+from recouvrements.models import Recouvrement
 from recouvrements.serializers import RecouvrementListSerializer
 
 # --- Date filter params (shared) ---
@@ -19,6 +28,16 @@ _DATE_PARAMS = [
     OpenApiParameter('startDate', str, description='Date debut (YYYY-MM-DD)'),
     OpenApiParameter('endDate', str, description='Date fin (YYYY-MM-DD)'),
 ]
+_GRANULARITY_PARAM = OpenApiParameter(
+    'granularity', str, description='Pas de la serie : hour, day (defaut), week ou month',
+)
+_COMPARE_PARAMS = _DATE_PARAMS + [
+    OpenApiParameter(
+        'compareTo', str,
+        description='Comparer a la periode precedente (previous) ou a la meme periode l\'an dernier (lastYear). '
+                    'Requiert startDate et endDate.',
+    ),
+]
 
 
 # --- Schema serializers ---
@@ -32,12 +51,13 @@ class _SummarySerializer(drf_serializers.Serializer):
 
 
 class _ParJourItemSerializer(drf_serializers.Serializer):
-    date = drf_serializers.DateField()
+    date = drf_serializers.CharField(help_text='Debut de la periode (YYYY-MM-DD, YYYY-MM pour month, YYYY-MM-DDTHH:00 pour hour)')
     montant = drf_serializers.IntegerField()
     count = drf_serializers.IntegerField()
 
 
 class _ParJourResponseSerializer(drf_serializers.Serializer):
+    granularity = drf_serializers.CharField()
     data = _ParJourItemSerializer(many=True)
 
 
@@ -86,135 +106,219 @@ class _TopPDVsResponseSerializer(drf_serializers.Serializer):
     data = _TopPDVItemSerializer(many=True)
 
 
-def _date_filter(request, qs, field='created_at'):
-    start = request.query_params.get('startDate')
-    end = request.query_params.get('endDate')
+def _rollup_filter(params, model=AgregatJournalier):
+    """Daily rollup rows matching the request's date filters.
+
+    ``startDate``/``endDate`` are business days, so every rapports filter maps
+    directly onto ``jour`` and the reports never need to scan recouvrements.
+    """
+    qs = model.objects.all()
+    start, end = parse_date_range(params)
     if start:
-        qs = qs.filter(**{f'{field}__date__gte': start})
+        qs = qs.filter(jour__gte=start)
     if end:
-        qs = qs.filter(**{f'{field}__date__lte': end})
+        qs = qs.filter(jour__lte=end)
     return qs
 
 
+def _windows_filter(params, windows, model=AgregatJournalier):
+    """Rollup rows for the request, plus a Q per window for conditional sums.
+
+    Without ``compareTo`` this is ``_rollup_filter`` and an empty current
+    window; with it, both windows are read in a single scan.
+    """
+    if windows is None:
+        return _rollup_filter(params, model), Q(), None
+    courant, precedent = (Q(jour__range=w) for w in windows)
+    return model.objects.filter(courant | precedent), courant, precedent
+
+
+def _compare(current, previous, keys):
+    """Per-figure previous value, delta and percentage change."""
+    result = {}
+    for key in keys:
+        cur, prev = current[key] or 0, previous[key] or 0
+        result[key] = {
+            'precedent': prev,
+            'delta': round(cur - prev, 2),
+            'variation': round((cur - prev) / prev * 100, 2) if prev else None,
+        }
+    return result
+
+
+def _comparison_period(params, windows):
+    start, end = windows[1]
+    return {'compareTo': params['compareTo'], 'startDate': str(start), 'endDate': str(end)}
+
+
+def _summary_sums(prefix, periode):
+    return {
+        f'{prefix}totalRecouvrements': Sum('nombre', filter=periode),
+        f'{prefix}montantTotal': Sum('montant', filter=periode),
+        f'{prefix}commissionTotale': Sum('commission', filter=periode),
+        f'{prefix}recouvrementsEnAttente': Sum('nombre', filter=periode & Q(status='EN_ATTENTE')),
+        f'{prefix}recouvrementsValides': Sum('nombre', filter=periode & Q(status='VALIDE')),
+        f'{prefix}recouvrementsRejetes': Sum('nombre', filter=periode & Q(status='REJETE')),
+    }
+
+
+def _summary_stats(sums, prefix=''):
+    stats = {k[len(prefix):]: v or 0 for k, v in sums.items() if k.startswith(prefix)}
+    valides = stats['recouvrementsValides']
+    rejetes = stats['recouvrementsRejetes']
+    total_resolus = valides + rejetes
+    stats['tauxValidation'] = round(valides / total_resolus * 100, 2) if total_resolus > 0 else 0
+    return stats
+
+
 class SummaryView(APIView):
     permission_classes = [IsAdmin]
 
-    @extend_schema(tags=['Rapports'], summary='Resume global', parameters=_DATE_PARAMS, responses={200: _SummarySerializer})
+    @extend_schema(tags=['Rapports'], summary='Resume global', parameters=_COMPARE_PARAMS, responses={200: _SummarySerializer})
+    @cached_report
     def get(self, request):
-        qs = _date_filter(request, Recouvrement.objects.all())
-
-        stats = qs.aggregate(
-            totalRecouvrements=Count('id'),
-            montantTotal=Sum('montant'),
-            commissionTotale=Sum('commission'),
-            recouvrementsEnAttente=Count('id', filter=Q(status='EN_ATTENTE')),
-            recouvrementsValides=Count('id', filter=Q(status='VALIDE')),
-            recouvrementsRejetes=Count('id', filter=Q(status='REJETE')),
+        return Response(self.compute(request.query_params))
+
+    def compute(self, params):
+        windows = comparison_windows(params)
+        qs, courant, precedent = _windows_filter(params, windows)
+
+        sums = _summary_sums('', courant)
+        if windows:
+            sums.update(_summary_sums('precedent_', precedent))
+        sums, pdv_actifs, agents_actifs = run_concurrently(
+            lambda: qs.aggregate(**sums),
+            PointDeVente.objects.filter(status='ACTIF').count,
+            User.objects.filter(role='agent', is_active=True).count,
         )
+        stats = _summary_stats({k: v for k, v in sums.items() if not k.startswith('precedent_')})
+
+        stats['pdvActifs'] = pdv_actifs
+        stats['agentsActifs'] = agents_actifs
+
+        if windows:
+            stats['comparaison'] = {
+                **_comparison_period(params, windows),
+                'valeurs': _compare(stats, _summary_stats(sums, 'precedent_'), [
+                    'totalRecouvrements', 'montantTotal', 'commissionTotale',
+                    'recouvrementsEnAttente', 'recouvrementsValides', 'recouvrementsRejetes',
+                    'tauxValidation',
+                ]),
+            }
 
-        for k in ('montantTotal', 'commissionTotale'):
-            if stats[k] is None:
-                stats[k] = 0
-
-        valides = stats['recouvrementsValides']
-        rejetes = stats['recouvrementsRejetes']
-        total_resolus = valides + rejetes
-        stats['tauxValidation'] = round(valides / total_resolus * 100, 2) if total_resolus > 0 else 0
-
-        stats['pdvActifs'] = PointDeVente.objects.filter(status='ACTIF').count()
-        stats['agentsActifs'] = User.objects.filter(role='agent', is_active=True).count()
-
-        return Response(stats)
+        return stats
 
 
 class ParJourView(APIView):
     permission_classes = [IsAdmin]
 
-    @extend_schema(tags=['Rapports'], summary='Revenus par jour', parameters=_DATE_PARAMS, responses={200: _ParJourResponseSerializer})
+    @extend_schema(
+        tags=['Rapports'], summary='Revenus par periode',
+        parameters=_DATE_PARAMS + [_GRANULARITY_PARAM], responses={200: _ParJourResponseSerializer},
+    )
+    @cached_report
     def get(self, request):
-        qs = _date_filter(request, Recouvrement.objects.all())
+        return Response(self.compute(request.query_params))
 
-        data = (
-            qs.annotate(date=TruncDate('created_at'))
-            .values('date')
-            .annotate(montant=Sum('montant'), count=Count('id'))
-            .order_by('date')
-        )
+    def compute(self, params):
+        granularite = series.parse_granularity(params)
+        start, end = parse_date_range(params)
 
-        return Response({
+        return {
+            'granularity': granularite,
             'data': [
-                {'date': str(row['date']), 'montant': row['montant'], 'count': row['count']}
-                for row in data
-            ]
-        })
+                {'date': periode, 'montant': montant, 'count': count}
+                for periode, montant, count in series.revenue_series(granularite, start, end)
+            ],
+        }
 
 
 class ParCategorieView(APIView):
     permission_classes = [IsAdmin]
 
-    @extend_schema(tags=['Rapports'], summary='Ventes par categorie', parameters=_DATE_PARAMS, responses={200: _ParCategorieResponseSerializer})
+    @extend_schema(tags=['Rapports'], summary='Ventes par categorie', parameters=_COMPARE_PARAMS, responses={200: _ParCategorieResponseSerializer})
+    @cached_report
     def get(self, request):
-        qs = LigneRecouvrement.objects.all()
+        return Response(self.compute(request.query_params))
 
-        start = request.query_params.get('startDate')
-        end = request.query_params.get('endDate')
-        if start:
-            qs = qs.filter(recouvrement__created_at__date__gte=start)
-        if end:
-            qs = qs.filter(recouvrement__created_at__date__lte=end)
+    def compute(self, params):
+        windows = comparison_windows(params)
+        qs, courant, precedent = _windows_filter(params, windows, AgregatCategorieJournalier)
 
         from core.enums import CategorieProduit
         label_map = dict(CategorieProduit.choices)
 
-        data = (
-            qs.values('categorie')
-            .annotate(
-                quantiteTotale=Sum('quantite'),
-                montantTotal=Sum('sous_total'),
-            )
-            .order_by('-montantTotal')
-        )
+        sums = {
+            'quantiteTotale': Coalesce(Sum('quantite', filter=courant), 0),
+            'montantTotal': Coalesce(Sum('montant', filter=courant), 0),
+        }
+        if windows:
+            sums['precedent_quantiteTotale'] = Sum('quantite', filter=precedent)
+            sums['precedent_montantTotal'] = Sum('montant', filter=precedent)
+        data = qs.values('categorie').annotate(**sums).order_by('-montantTotal')
+
+        result = []
+        for row in data:
+            item = {
+                'categorie': row['categorie'],
+                'label': label_map.get(row['categorie'], row['categorie']),
+                'quantiteTotale': row['quantiteTotale'],
+                'montantTotal': row['montantTotal'],
+            }
+            if windows:
+                item['comparaison'] = _compare(item, {
+                    'quantiteTotale': row['precedent_quantiteTotale'],
+                    'montantTotal': row['precedent_montantTotal'],
+                }, ['quantiteTotale', 'montantTotal'])
+            result.append(item)
 
-        return Response({
-            'data': [
-                {
-                    'categorie': row['categorie'],
-                    'label': label_map.get(row['categorie'], row['categorie']),
-                    'quantiteTotale': row['quantiteTotale'],
-                    'montantTotal': row['montantTotal'],
-                }
-                for row in data
-            ]
-        })
+        if windows:
+            return {'data': result, 'comparaison': _comparison_period(params, windows)}
+        return {'data': result}
 
 
 class ParMethodeView(APIView):
     permission_classes = [IsAdmin]
 
-    @extend_schema(tags=['Rapports'], summary='Repartition par methode de paiement', parameters=_DATE_PARAMS, responses={200: _ParMethodeResponseSerializer})
+    @extend_schema(tags=['Rapports'], summary='Repartition par methode de paiement', parameters=_COMPARE_PARAMS, responses={200: _ParMethodeResponseSerializer})
+    @cached_report
     def get(self, request):
-        qs = _date_filter(request, Recouvrement.objects.all())
+        return Response(self.compute(request.query_params))
+
+    def compute(self, params):
+        windows = comparison_windows(params)
+        qs, courant, precedent = _windows_filter(params, windows)
 
         from core.enums import MethodePaiement
         label_map = dict(MethodePaiement.choices)
 
-        data = (
-            qs.values('methode_paiement')
-            .annotate(count=Count('id'), total=Sum('montant'))
-            .order_by('-total')
-        )
+        sums = {
+            'count': Coalesce(Sum('nombre', filter=courant), 0),
+            'total': Coalesce(Sum('montant', filter=courant), 0),
+        }
+        if windows:
+            sums['precedent_count'] = Sum('nombre', filter=precedent)
+            sums['precedent_total'] = Sum('montant', filter=precedent)
+        data = qs.values('methode_paiement').annotate(**sums).order_by('-total')
+
+        result = []
+        for row in data:
+            item = {
+                'methode': row['methode_paiement'],
+                'label': label_map.get(row['methode_paiement'], row['methode_paiement']),
+                'count': row['count'],
+                'total': row['total'],
+            }
+            if windows:
+                item['comparaison'] = _compare(item, {
+                    'count': row['precedent_count'],
+                    'total': row['precedent_total'],
+                }, ['count', 'total'])
+            result.append(item)
 
-        return Response({
-            'data': [
-                {
-                    'methode': row['methode_paiement'],
-                    'label': label_map.get(row['methode_paiement'], row['methode_paiement']),
-                    'count': row['count'],
-                    'total': row['total'],
-                }
-                for row in data
-            ]
-        })
+        if windows:
+            return {'data': result, 'comparaison': _comparison_period(params, windows)}
+        return {'data': result}
 
 
 class TopAgentsView(APIView):
@@ -225,21 +329,25 @@ class TopAgentsView(APIView):
         parameters=_DATE_PARAMS + [OpenApiParameter('limit', int, description='Nombre max de resultats (defaut 10)')],
         responses={200: _TopAgentsResponseSerializer},
     )
+    @cached_report
     def get(self, request):
-        limit = int(request.query_params.get('limit', 10))
-        qs = _date_filter(request, Recouvrement.objects.all())
+        return Response(self.compute(request.query_params))
+
+    def compute(self, params):
+        limit = int(params.get('limit', 10))
+        qs = _rollup_filter(params)
 
         data = (
             qs.values('agent_id', 'agent__nom')
             .annotate(
-                totalRecouvrements=Count('id'),
+                totalRecouvrements=Sum('nombre'),
                 montantTotal=Sum('montant'),
                 commissionTotale=Sum('commission'),
             )
             .order_by('-montantTotal')[:limit]
         )
 
-        return Response({
+        return {
             'data': [
                 {
                     'agentId': str(row['agent_id']),
@@ -250,7 +358,7 @@ class TopAgentsView(APIView):
                 }
                 for row in data
             ]
-        })
+        }
 
 
 class TopPDVsView(APIView):
@@ -261,20 +369,24 @@ class TopPDVsView(APIView):
         parameters=_DATE_PARAMS + [OpenApiParameter('limit', int, description='Nombre max de resultats (defaut 10)')],
         responses={200: _TopPDVsResponseSerializer},
     )
+    @cached_report
     def get(self, request):
-        limit = int(request.query_params.get('limit', 10))
-        qs = _date_filter(request, Recouvrement.objects.all())
+        return Response(self.compute(request.query_params))
+
+    def compute(self, params):
+        limit = int(params.get('limit', 10))
+        qs = _rollup_filter(params)
 
         data = (
             qs.values('point_de_vente_id', 'point_de_vente__nom')
             .annotate(
-                totalRecouvrements=Count('id'),
+                totalRecouvrements=Sum('nombre'),
                 montantTotal=Sum('montant'),
             )
             .order_by('-montantTotal')[:limit]
         )
 
-        return Response({
+        return {
             'data': [
                 {
                     'pdvId': str(row['point_de_vente_id']),
@@ -284,86 +396,228 @@ class TopPDVsView(APIView):
                 }
                 for row in data
             ]
-        })
+        }
 
 
-class AdminStatsView(APIView):
+_GEO_PARAMS = _DATE_PARAMS + [
+    OpenApiParameter('zone', str, description='Restreindre a une zone'),
+    OpenApiParameter('ville', str, description='Restreindre a une ville'),
+    OpenApiParameter('commune', str, description='Restreindre a une commune'),
+]
+
+
+class _GeoItemSerializer(drf_serializers.Serializer):
+    totalRecouvrements = drf_serializers.IntegerField()
+    montantTotal = drf_serializers.IntegerField()
+    commissionTotale = drf_serializers.IntegerField()
+    pdvActifs = drf_serializers.IntegerField()
+
+
+class _GeoResponseSerializer(drf_serializers.Serializer):
+    data = _GeoItemSerializer(many=True)
+
+
+class _GeoView(APIView):
+    """Breakdown at ``niveau``; ``cles`` name the grouping columns in the output."""
     permission_classes = [IsAdmin]
+    niveau = None
+    cles = ()
+
+    @cached_report
+    def get(self, request):
+        return Response(self.compute(request.query_params))
+
+    def compute(self, params):
+        result = []
+        for row in geographie.repartition(self.niveau, params):
+            *valeurs, total, montant, commission, pdv_actifs = row
+            item = dict(zip(self.cles, valeurs))
+            item.update({
+                'totalRecouvrements': total,
+                'montantTotal': montant,
+                'commissionTotale': commission,
+                'pdvActifs': pdv_actifs,
+            })
+            result.append(item)
+        return {'data': result}
+
+
+class ParZoneView(_GeoView):
+    niveau = 'zone'
+    cles = ('zone',)
+
+    @extend_schema(tags=['Rapports'], summary='Revenus par zone', parameters=_GEO_PARAMS, responses={200: _GeoResponseSerializer})
+    def get(self, request):
+        return super().get(request)
 
-    @extend_schema(tags=['Stats'], summary='Statistiques dashboard admin')
+
+class ParVilleView(_GeoView):
+    niveau = 'ville'
+    cles = ('ville',)
+
+    @extend_schema(tags=['Rapports'], summary='Revenus par ville', parameters=_GEO_PARAMS, responses={200: _GeoResponseSerializer})
+    def get(self, request):
+        return super().get(request)
+
+
+class ParCommuneView(_GeoView):
+    niveau = 'commune'
+    cles = ('ville', 'commune')
+
+    @extend_schema(
+        tags=['Rapports'], summary='Revenus par commune (drill-down ?zone=)',
+        parameters=_GEO_PARAMS, responses={200: _GeoResponseSerializer},
+    )
     def get(self, request):
-        all_recs = Recouvrement.objects.all()
+        return super().get(request)
 
-        stats = all_recs.aggregate(
-            totalRecouvrements=Count('id'),
-            montantTotal=Sum('montant'),
-            commissionTotale=Sum('commission'),
+
+class ParPDVView(_GeoView):
+    niveau = 'pdv'
+    cles = ('pdvId', 'code', 'nom', 'ville', 'commune', 'zone', 'status')
+
+    @extend_schema(
+        tags=['Rapports'], summary='Revenus par point de vente (drill-down ?zone=&commune=)',
+        parameters=_GEO_PARAMS, responses={200: _GeoResponseSerializer},
+    )
+    def get(self, request):
+        return super().get(request)
+
+    def compute(self, params):
+        data = super().compute(params)
+        for item in data['data']:
+            item['pdvId'] = str(item['pdvId'])
+            item['actif'] = bool(item.pop('pdvActifs'))
+        return data
+
+
+# All admin dashboard figures except the recent list, in one statement.
+_ADMIN_STATS_SQL = """
+WITH totaux AS (
+    SELECT
+        COALESCE(SUM(nombre), 0)::bigint AS total,
+        COALESCE(SUM(montant), 0)::bigint AS montant,
+        COALESCE(SUM(commission), 0)::bigint AS commission,
+        COALESCE(SUM(nombre) FILTER (WHERE status = 'VALIDE'), 0)::bigint AS valides,
+        COALESCE(SUM(nombre) FILTER (WHERE status = 'REJETE'), 0)::bigint AS rejetes
+    FROM agregats_journaliers
+),
+par_periode AS ({serie}),
+par_methode AS (
+    SELECT methode_paiement, SUM(nombre)::bigint AS count, SUM(montant)::bigint AS total
+    FROM agregats_journaliers
+    GROUP BY methode_paiement
+),
+top_agents AS (
+    SELECT u.nom, SUM(a.montant)::bigint AS total
+    FROM agregats_journaliers a
+    JOIN users u ON u.id = a.agent_id
+    GROUP BY a.agent_id, u.nom
+    ORDER BY total DESC
+    LIMIT 5
+)
+SELECT
+    t.total, t.montant, t.commission, t.valides, t.rejetes,
+    (SELECT COUNT(*) FROM points_de_vente WHERE status = 'ACTIF'),
+    (SELECT COUNT(*) FROM users WHERE role = 'agent' AND is_active),
+    (SELECT COALESCE(json_agg(json_build_array(periode, montant) ORDER BY periode), '[]') FROM par_periode),
+    (SELECT COALESCE(json_agg(json_build_array(methode_paiement, count, total)), '[]') FROM par_methode),
+    (SELECT COALESCE(json_agg(json_build_array(nom, total) ORDER BY total DESC), '[]') FROM top_agents)
+FROM totaux t
+"""
+
+
+def _admin_series_start(granularite, today):
+    """First day of the dashboard chart: 48 hours, 15 days, 12 weeks or 12 months."""
+    if granularite == 'hour':
+        return today - timedelta(days=1)
+    if granularite == 'week':
+        return today - timedelta(weeks=11)
+    if granularite == 'month':
+        mois = today.year * 12 + today.month - 1 - 11
+        return today.replace(year=mois // 12, month=mois % 12 + 1, day=1)
+    return today - timedelta(days=14)
+
+
+def _admin_stats(granularite):
+    today = timezone.localdate()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _ADMIN_STATS_SQL.format(serie=series.series_sql(granularite)),
+            series.series_params(granularite, _admin_series_start(granularite, today), today),
         )
-        for k in ('montantTotal', 'commissionTotale'):
-            if stats[k] is None:
-                stats[k] = 0
+        return cursor.fetchone()
+
+
+def _admin_recent():
+    return list(
+        Recouvrement.objects.order_by('-created_at')
+        .values(
+            'id', 'code', 'point_de_vente__nom', 'agent__nom', 'montant',
+            'methode_paiement', 'status', 'created_at',
+        )[:5]
+    )
+
+
+def _admin_stats_queries(granularite):
+    """The admin dashboard's two statements, as zero-argument callables.
+
+    The aggregates read the rollups and the recent list the recouvrements
+    indexes; they are independent, so they run concurrently.
+    """
+    return lambda: _admin_stats(granularite), _admin_recent
+
+
+class AdminStatsView(APIView):
+    permission_classes = [IsAdmin]
 
-        stats['pdvActifs'] = PointDeVente.objects.filter(status='ACTIF').count()
-        stats['agentsActifs'] = User.objects.filter(role='agent', is_active=True).count()
+    @extend_schema(tags=['Stats'], summary='Statistiques dashboard admin', parameters=[_GRANULARITY_PARAM])
+    @cached_report
+    def get(self, request):
+        granularite = series.parse_granularity(request.query_params)
+        (
+            (
+                total, montant, commission, valides, rejetes,
+                pdv_actifs, agents_actifs, daily, par_methode, top_agents,
+            ),
+            recent,
+        ) = run_concurrently(*_admin_stats_queries(granularite))
 
-        valides = all_recs.filter(status='VALIDE').count()
-        rejetes = all_recs.filter(status='REJETE').count()
         total_resolus = valides + rejetes
-        stats['tauxValidation'] = round(valides / total_resolus * 100, 2) if total_resolus > 0 else 0
-
-        # Revenue par jour (last 14 days)
-        fourteen_days_ago = timezone.now().date() - timedelta(days=14)
-        daily = (
-            all_recs.filter(created_at__date__gte=fourteen_days_ago)
-            .annotate(date=TruncDate('created_at'))
-            .values('date')
-            .annotate(montant=Sum('montant'))
-            .order_by('date')
-        )
-        stats['revenueParJour'] = [
-            {'date': str(row['date']), 'montant': row['montant']}
-            for row in daily
-        ]
+        stats = {
+            'totalRecouvrements': total,
+            'montantTotal': montant,
+            'commissionTotale': commission,
+            'pdvActifs': pdv_actifs,
+            'agentsActifs': agents_actifs,
+            'tauxValidation': round(valides / total_resolus * 100, 2) if total_resolus > 0 else 0,
+            'revenueParJour': [
+                {'date': date, 'montant': montant_jour}
+                for date, montant_jour in daily
+            ],
+        }
 
-        # Recent recouvrements (last 5)
-        recent = (
-            all_recs.select_related('point_de_vente', 'agent')
-            .prefetch_related('lignes')
-            .order_by('-created_at')[:5]
-        )
         stats['recentRecouvrements'] = [
             {
-                'id': str(r.id),
-                'code': r.code,
-                'pointDeVenteNom': r.point_de_vente.nom,
-                'agentNom': r.agent.nom,
-                'montant': r.montant,
-                'methodePaiement': r.methode_paiement,
-                'status': r.status,
-                'createdAt': r.created_at.isoformat(),
+                'id': str(r['id']),
+                'code': r['code'],
+                'pointDeVenteNom': r['point_de_vente__nom'],
+                'agentNom': r['agent__nom'],
+                'montant': r['montant'],
+                'methodePaiement': r['methode_paiement'],
+                'status': r['status'],
+                'createdAt': r['created_at'].isoformat(),
             }
             for r in recent
         ]
 
-        # Par methode
-        par_methode_qs = (
-            all_recs.values('methode_paiement')
-            .annotate(count=Count('id'), total=Sum('montant'))
-        )
         stats['parMethode'] = {
-            row['methode_paiement']: {'count': row['count'], 'total': row['total']}
-            for row in par_methode_qs
+            methode: {'count': count, 'total': total_methode}
+            for methode, count, total_methode in par_methode
         }
-
-        # Top agents (top 5)
-        top_agents = (
-            all_recs.values('agent__nom')
-            .annotate(total=Sum('montant'))
-            .order_by('-total')[:5]
-        )
         stats['topAgents'] = [
-            {'nom': row['agent__nom'], 'total': row['total']}
-            for row in top_agents
+            {'nom': nom, 'total': total_agent}
+            for nom, total_agent in top_agents
         ]
 
         return Response(stats)
@@ -373,31 +627,30 @@ class AgentStatsView(APIView):
     permission_classes = [IsAgent]
 
     @extend_schema(tags=['Stats'], summary='Statistiques dashboard agent')
+    @cached_report
     def get(self, request):
         agent_recs = Recouvrement.objects.filter(agent_id=request.user.id)
 
-        stats = agent_recs.aggregate(
-            totalRecouvrements=Count('id'),
-            montantTotal=Sum('montant'),
-            recouvrementsEnAttente=Count('id', filter=Q(status='EN_ATTENTE')),
+        stats, total_pdv, recent = run_concurrently(
+            lambda: agent_recs.aggregate(
+                totalRecouvrements=Count('id'),
+                montantTotal=Sum('montant'),
+                recouvrementsEnAttente=Count('id', filter=Q(status='EN_ATTENTE')),
+            ),
+            PointDeVente.objects.filter(agent_id=request.user.id).count,
+            lambda: list(agent_recs.select_related('point_de_vente').order_by('-created_at')[:5]),
         )
         for k in ('montantTotal',):
             if stats[k] is None:
                 stats[k] = 0
 
-        stats['totalPDV'] = PointDeVente.objects.filter(agent_id=request.user.id).count()
-
-        recent = (
-            agent_recs.select_related('point_de_vente', 'agent')
-            .prefetch_related('lignes')
-            .order_by('-created_at')[:5]
-        )
+        stats['totalPDV'] = total_pdv
         stats['recentRecouvrements'] = [
             {
                 'id': str(r.id),
                 'code': r.code,
                 'pointDeVenteNom': r.point_de_vente.nom,
-                'articlesSummary': r.articles_summary,
+                'articlesSummary': r.resume_articles,
                 'montant': r.montant,
                 'methodePaiement': r.methode_paiement,
                 'status': r.status,
@@ -407,3 +660,40 @@ class AgentStatsView(APIView):
         ]
 
         return Response(stats)
+
+
+@extend_schema(tags=['Rapports'])
+class RapportJobListView(APIView):
+    permission_classes = [IsAdmin]
+
+    @extend_schema(
+        summary='Lancer un rapport en arriere-plan',
+        description='Pour les longues periodes: le rapport est calcule par le worker et recupere via son id.',
+        request=RapportJobCreateSerializer,
+        responses={202: RapportJobSerializer},
+    )
+    def post(self, request):
+        serializer = RapportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = RapportJob.objects.create(
+            type=serializer.validated_data['type'],
+            params=serializer.validated_data['params'],
+            created_by=request.user,
+        )
+        return Response(RapportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema(tags=['Rapports'])
+class RapportJobDetailView(APIView):
+    permission_classes = [IsAdmin]
+
+    @extend_schema(summary='Statut et resultat d\'un rapport en arriere-plan', responses={200: RapportJobSerializer})
+    def get(self, request, pk=None):
+        try:
+            job = RapportJob.objects.get(pk=pk)
+        except (RapportJob.DoesNotExist, ValueError, DjangoValidationError):
+            return Response(
+                {'error': {'code': 'NOT_FOUND', 'message': 'Rapport introuvable'}},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(RapportJobSerializer(job).data)
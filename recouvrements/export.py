@@ -0,0 +1,109 @@
+"""Streaming CSV / NDJSON export of recouvrements with their lignes.
+
+Rows are read through a server-side cursor (``QuerySet.iterator``) and written
+to the response as they arrive, so memory use does not depend on the size of
+the export.
+"""
+import csv
+import json
+from itertools import groupby
+
+from django.http import StreamingHttpResponse
+
+from recouvrements.models import LigneRecouvrement
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+CHUNK_SIZE = 2000
+
+# (export column, LigneRecouvrement lookup)
+_REC_COLUMNS = [
+    ('id', 'recouvrement_id'),
+    ('code', 'recouvrement__code'),
+    ('pointDeVenteId', 'recouvrement__point_de_vente_id'),
+    ('pointDeVenteCode', 'recouvrement__point_de_vente__code'),
+    ('pointDeVenteNom', 'recouvrement__point_de_vente__nom'),
+    ('agentId', 'recouvrement__agent_id'),
+    ('agentNom', 'recouvrement__agent__nom'),
+    ('montant', 'recouvrement__montant'),
+    ('tauxCommission', 'recouvrement__taux_commission'),
+    ('commission', 'recouvrement__commission'),
+    ('methodePaiement', 'recouvrement__methode_paiement'),
+    ('status', 'recouvrement__status'),
+    ('reference', 'recouvrement__reference'),
+    ('notes', 'recouvrement__notes'),
+    ('createdAt', 'recouvrement__created_at'),
+    ('validatedAt', 'recouvrement__validated_at'),
+]
+_LIGNE_COLUMNS = [
+    ('ligneId', 'id'),
+    ('nomProduit', 'nom_produit'),
+    ('categorie', 'categorie'),
+    ('prixUnitaire', 'prix_unitaire'),
+    ('quantite', 'quantite'),
+    ('sousTotal', 'sous_total'),
+]
+_N_REC = len(_REC_COLUMNS)
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _rows(recouvrements, ordering):
+    """One tuple per ligne, grouped by recouvrement in ``ordering`` order."""
+    desc = ordering.startswith('-')
+    field = ordering.lstrip('-')
+    order = [f'recouvrement__{field}', 'recouvrement_id']
+    if desc:
+        order = [f'-{o}' for o in order]
+    lookups = [lookup for _, lookup in _REC_COLUMNS + _LIGNE_COLUMNS]
+    return (
+        LigneRecouvrement.objects
+        .filter(recouvrement__in=recouvrements.order_by().values('id'))
+        .order_by(*order)
+        .values_list(*lookups)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in _REC_COLUMNS + _LIGNE_COLUMNS])
+    for row in rows:
+        yield writer.writerow([_text(v) for v in row])
+
+
+def _ndjson_lines(rows):
+    for _, group in groupby(rows, key=lambda row: row[0]):
+        lignes = []
+        for row in group:
+            lignes.append({
+                name: _text(v) for (name, _), v in zip(_LIGNE_COLUMNS, row[_N_REC:])
+            })
+        rec = {name: _text(v) for (name, _), v in zip(_REC_COLUMNS, row[:_N_REC])}
+        rec['lignes'] = lignes
+        yield json.dumps(rec, ensure_ascii=False) + '\n'
+
+
+def stream_export(recouvrements, ordering, export_format):
+    content_type, extension = EXPORT_FORMATS[export_format]
+    rows = _rows(recouvrements, ordering)
+    lines = _csv_lines(rows) if export_format == 'csv' else _ndjson_lines(rows)
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="recouvrements.{extension}"'
+    return response
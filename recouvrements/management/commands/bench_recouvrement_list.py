@@ -0,0 +1,48 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from recouvrements import projections
+from recouvrements.models import Recouvrement
+from recouvrements.serializers import RecouvrementListSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare the serializer and projection paths of the recouvrement list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 100])
+
+    def handle(self, *args, **options):
+        qs = Recouvrement.objects.select_related(
+            'point_de_vente', 'agent',
+        ).prefetch_related('lignes').order_by('-created_at', '-id')
+        renderer = JSONRenderer()
+
+        def serializer_path(size):
+            return renderer.render(RecouvrementListSerializer(list(qs[:size]), many=True).data)
+
+        def projection_path(size):
+            return renderer.render(projections.represent(list(projections.list_values(qs)[:size])))
+
+        for size in options['page_sizes']:
+            if serializer_path(size) != projection_path(size):
+                raise CommandError(f'Outputs differ for page size {size}')
+
+            timings = {}
+            for name, path in (('serializer', serializer_path), ('projection', projection_path)):
+                runs = []
+                for _ in range(options['iterations']):
+                    start = time.perf_counter()
+                    path(size)
+                    runs.append((time.perf_counter() - start) * 1000)
+                timings[name] = statistics.median(runs)
+
+            self.stdout.write(
+                f'pageSize={size}: serializer {timings["serializer"]:.2f} ms, '
+                f'projection {timings["projection"]:.2f} ms, '
+                f'x{timings["serializer"] / timings["projection"]:.1f} (identical JSON)'
+            )
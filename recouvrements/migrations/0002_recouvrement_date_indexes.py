@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-17 22:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdv', '0001_initial'),
+        ('recouvrements', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recouvrement',
+            index=models.Index(fields=['agent', 'created_at'], name='recouvremen_agent_i_e5939b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recouvrement',
+            index=models.Index(fields=['status', 'created_at'], name='recouvremen_status_71e723_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recouvrement',
+            index=models.Index(fields=['point_de_vente', 'created_at'], name='recouvremen_point_d_b1c482_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdv', '0002_pointdevente_ville_commune_index'),
+        ('recouvrements', '0002_recouvrement_date_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recouvrement',
+            name='client_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='recouvrement',
+            constraint=models.UniqueConstraint(fields=('agent', 'client_id'), name='recouvrements_agent_client_id_unique'),
+        ),
+    ]
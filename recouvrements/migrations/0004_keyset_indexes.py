@@ -0,0 +1,40 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdv', '0002_pointdevente_ville_commune_index'),
+        ('recouvrements', '0003_recouvrement_client_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recouvrement',
+            name='recouvremen_created_78f5cd_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recouvrement',
+            name='recouvremen_agent_i_e5939b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='recouvrement',
+            index=models.Index(fields=['agent', 'created_at', 'id'], name='recouvremen_agent_i_c1ab0f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recouvrement',
+            index=models.Index(fields=['created_at', 'id'], name='recouvremen_created_306f1d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recouvrement',
+            index=models.Index(fields=['montant', 'id'], name='recouvremen_montant_c6de12_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recouvrement',
+            index=models.Index(fields=['status', 'id'], name='recouvremen_status_f20b1a_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:23
+
+from django.db import migrations, models
+
+# Same text as recouvrements.models.articles_summary. Lignes have no order
+# column; ctid follows insertion order, which is what the unordered
+# prefetch used to return.
+_BACKFILL_SQL = """
+UPDATE recouvrements r
+SET nombre_lignes = l.n,
+    resume_articles = CASE
+        WHEN l.n <= 2 THEN concat(
+            l.n, ' article', CASE WHEN l.n > 1 THEN 's' END, ' - ', array_to_string(l.noms[1:2], ', ')
+        )
+        ELSE concat(l.n, ' articles - ', array_to_string(l.noms[1:2], ', '), ', ...')
+    END
+FROM (
+    SELECT recouvrement_id, COUNT(*) AS n, array_agg(nom_produit ORDER BY ctid) AS noms
+    FROM lignes_recouvrement
+    GROUP BY recouvrement_id
+) l
+WHERE l.recouvrement_id = r.id
+"""
+
+
+def backfill(apps, schema_editor):
+    Recouvrement = apps.get_model('recouvrements', 'Recouvrement')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(_BACKFILL_SQL)
+    else:
+        from recouvrements.models import articles_summary
+
+        for rec in Recouvrement.objects.prefetch_related('lignes').iterator(chunk_size=2000):
+            noms = [l.nom_produit for l in rec.lignes.all()]
+            Recouvrement.objects.filter(pk=rec.pk).update(
+                nombre_lignes=len(noms), resume_articles=articles_summary(noms),
+            )
+    Recouvrement.objects.filter(nombre_lignes=0, resume_articles='').update(resume_articles='0 article - ')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recouvrements', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recouvrement',
+            name='nombre_lignes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recouvrement',
+            name='resume_articles',
+            field=models.CharField(blank=True, default='', max_length=600),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdv', '0003_pointdevente_sync_index'),
+        ('recouvrements', '0005_recouvrement_resume_articles'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recouvrement',
+            index=models.Index(fields=['agent', 'updated_at', 'id'], name='recouvremen_agent_i_9041f3_idx'),
+        ),
+    ]
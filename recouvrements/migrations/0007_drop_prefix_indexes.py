@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdv', '0003_pointdevente_sync_index'),
+        ('recouvrements', '0006_recouvrement_sync_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recouvrement',
+            name='recouvremen_point_d_bde790_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recouvrement',
+            name='recouvremen_agent_i_81bd2d_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recouvrement',
+            name='recouvremen_status_c9f455_idx',
+        ),
+        migrations.AlterField(
+            model_name='recouvrement',
+            name='agent',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='recouvrements', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='recouvrement',
+            name='point_de_vente',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='recouvrements', to='pdv.pointdevente'),
+        ),
+    ]
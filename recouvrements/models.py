@@ -5,14 +5,25 @@ from django.db import models
 from core.enums import CategorieProduit, MethodePaiement, RecouvrementStatus
 
 
+def articles_summary(noms):
+    count = len(noms)
+    preview = ', '.join(noms[:2])
+    if count <= 2:
+        suffix = 's' if count > 1 else ''
+        return f'{count} article{suffix} - {preview}'
+    return f'{count} articles - {preview}, ...'
+
+
 class Recouvrement(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     code = models.CharField(max_length=20, unique=True)
+    # Looked up through the (point_de_vente, created_at) and (agent, created_at, id)
+    # indexes below; a single-column index would duplicate their prefix.
     point_de_vente = models.ForeignKey(
-        'pdv.PointDeVente', on_delete=models.CASCADE, related_name='recouvrements',
+        'pdv.PointDeVente', on_delete=models.CASCADE, related_name='recouvrements', db_index=False,
     )
     agent = models.ForeignKey(
-        'accounts.User', on_delete=models.CASCADE, related_name='recouvrements',
+        'accounts.User', on_delete=models.CASCADE, related_name='recouvrements', db_index=False,
     )
     montant = models.IntegerField()
     taux_commission = models.DecimalField(max_digits=5, decimal_places=4)
@@ -26,31 +37,40 @@ class Recouvrement(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     validated_at = models.DateTimeField(blank=True, null=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Id generated on the device for offline submissions (see the batch endpoint).
+    client_id = models.UUIDField(blank=True, null=True)
+    # Copied from the lignes at creation so lists never read lignes_recouvrement;
+    # lignes are not edited afterwards.
+    resume_articles = models.CharField(max_length=600, blank=True, default='')
+    nombre_lignes = models.IntegerField(default=0)
 
     class Meta:
         db_table = 'recouvrements'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['agent', 'client_id'], name='recouvrements_agent_client_id_unique',
+            ),
+        ]
         indexes = [
-            models.Index(fields=['point_de_vente']),
-            models.Index(fields=['agent']),
-            models.Index(fields=['status']),
             models.Index(fields=['methode_paiement']),
-            models.Index(fields=['created_at']),
+            models.Index(fields=['agent', 'created_at', 'id']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['point_de_vente', 'created_at']),
+            # Keyset pagination seeks on (sort field, id).
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['montant', 'id']),
+            models.Index(fields=['status', 'id']),
+            # Delta sync seeks on (updated_at, id) within an agent's recouvrements.
+            models.Index(fields=['agent', 'updated_at', 'id']),
         ]
         ordering = ['-created_at']
 
     def __str__(self):
         return f'{self.code} - {self.montant} FCFA'
 
-    @property
-    def articles_summary(self):
-        lignes = self.lignes.all()
-        noms = [l.nom_produit for l in lignes]
-        count = len(noms)
-        preview = ', '.join(noms[:2])
-        if count <= 2:
-            suffix = 's' if count > 1 else ''
-            return f'{count} article{suffix} - {preview}'
-        return f'{count} articles - {preview}, ...'
+    def set_lignes_summary(self, lignes):
+        self.nombre_lignes = len(lignes)
+        self.resume_articles = articles_summary([l.nom_produit for l in lignes])
 
 
 class LigneRecouvrement(models.Model):
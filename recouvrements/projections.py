@@ -0,0 +1,110 @@
+"""List representation of recouvrements built from ``.values()`` rows.
+
+``RecouvrementListSerializer`` instantiates the recouvrement, its PDV,
+agent and every ligne as model objects and runs each field through a
+serializer field. The list endpoint only needs plain columns, so this path
+reads one projection of the (joined) recouvrement columns and one grouped
+fetch of the page's lignes, and formats the few typed values with the same
+DRF fields the serializer uses. The output is identical, key order
+included; ``bench_recouvrement_list`` compares both.
+
+Callers may restrict the output to some ``FIELDS`` (``?fields=``); the
+query then selects only their columns, joins ``points_de_vente``/``users``
+only for the names and codes, and skips the lignes fetch unless
+``lignes`` is asked for.
+"""
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from recouvrements.models import LigneRecouvrement
+
+FIELDS = {
+    'id': ('id',),
+    'code': ('code',),
+    'pointDeVenteId': ('point_de_vente_id',),
+    'pointDeVenteNom': ('point_de_vente__nom',),
+    'pointDeVenteCode': ('point_de_vente__code',),
+    'agentId': ('agent_id',),
+    'agentNom': ('agent__nom',),
+    'lignes': (),
+    'articlesSummary': ('resume_articles',),
+    'nombreLignes': ('nombre_lignes',),
+    'montant': ('montant',),
+    'tauxCommission': ('taux_commission',),
+    'commission': ('commission',),
+    'methodePaiement': ('methode_paiement',),
+    'status': ('status',),
+    'reference': ('reference',),
+    'notes': ('notes',),
+    'createdAt': ('created_at',),
+    'validatedAt': ('validated_at',),
+}
+EXPANDABLE = ('lignes',)
+_LIGNE_COLUMNS = ('recouvrement_id', 'id', 'nom_produit', 'categorie', 'prix_unitaire', 'quantite', 'sous_total')
+
+_taux = serializers.DecimalField(max_digits=5, decimal_places=4)
+_datetime = serializers.DateTimeField()
+
+_FORMATS = {
+    'id': lambda row, lignes: str(row['id']),
+    'code': lambda row, lignes: row['code'],
+    'pointDeVenteId': lambda row, lignes: str(row['point_de_vente_id']),
+    'pointDeVenteNom': lambda row, lignes: row['point_de_vente__nom'],
+    'pointDeVenteCode': lambda row, lignes: row['point_de_vente__code'],
+    'agentId': lambda row, lignes: str(row['agent_id']),
+    'agentNom': lambda row, lignes: row['agent__nom'],
+    'lignes': lambda row, lignes: [
+        {
+            'id': str(ligne_id),
+            'nomProduit': nom,
+            'categorie': categorie,
+            'prixUnitaire': prix,
+            'quantite': quantite,
+            'sousTotal': sous_total,
+        }
+        for ligne_id, nom, categorie, prix, quantite, sous_total in lignes
+    ],
+    'articlesSummary': lambda row, lignes: row['resume_articles'],
+    'nombreLignes': lambda row, lignes: row['nombre_lignes'],
+    'montant': lambda row, lignes: row['montant'],
+    'tauxCommission': lambda row, lignes: _taux.to_representation(row['taux_commission']),
+    'commission': lambda row, lignes: row['commission'],
+    'methodePaiement': lambda row, lignes: row['methode_paiement'],
+    'status': lambda row, lignes: row['status'],
+    'reference': lambda row, lignes: row['reference'],
+    'notes': lambda row, lignes: row['notes'],
+    'createdAt': lambda row, lignes: _datetime.to_representation(row['created_at']),
+    'validatedAt': lambda row, lignes: _datetime.to_representation(row['validated_at']),
+}
+
+
+def list_values(queryset, fields=FIELDS, extra=()):
+    """``queryset`` as the dict rows ``represent`` expects for ``fields``.
+
+    Only the columns (and joins) those fields need are selected; ``extra``
+    adds columns the caller needs itself, e.g. the cursor's sort key.
+    """
+    columns = ['id']
+    for column in [c for field in fields for c in FIELDS[field]] + list(extra):
+        if column not in columns:
+            columns.append(column)
+    return queryset.prefetch_related(None).values(*columns)
+
+
+def represent(rows, fields=FIELDS):
+    """Same data as ``RecouvrementListSerializer(recs, many=True).data``, restricted to ``fields``."""
+    fields = list(fields)
+    lignes = defaultdict(list)
+    ids = [row['id'] for row in rows]
+    if ids and 'lignes' in fields:
+        for rec_id, *ligne in LigneRecouvrement.objects.filter(
+            recouvrement_id__in=ids,
+        ).values_list(*_LIGNE_COLUMNS):
+            lignes[rec_id].append(ligne)
+
+    formatters = [(field, _FORMATS[field]) for field in fields]
+    return [
+        {field: formatter(row, lignes[row['id']]) for field, formatter in formatters}
+        for row in rows
+    ]
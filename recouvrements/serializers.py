@@ -20,7 +20,8 @@ class RecouvrementListSerializer(serializers.ModelSerializer):
     agentId = serializers.UUIDField(source='agent_id', read_only=True)
     agentNom = serializers.CharField(source='agent.nom', read_only=True)
     lignes = LigneSerializer(many=True, read_only=True)
-    articlesSummary = serializers.CharField(source='articles_summary', read_only=True)
+    articlesSummary = serializers.CharField(source='resume_articles', read_only=True)
+    nombreLignes = serializers.IntegerField(source='nombre_lignes', read_only=True)
     tauxCommission = serializers.DecimalField(
         source='taux_commission', max_digits=5, decimal_places=4, read_only=True,
     )
@@ -32,7 +33,7 @@ class RecouvrementListSerializer(serializers.ModelSerializer):
         model = Recouvrement
         fields = [
             'id', 'code', 'pointDeVenteId', 'pointDeVenteNom', 'pointDeVenteCode',
-            'agentId', 'agentNom', 'lignes', 'articlesSummary',
+            'agentId', 'agentNom', 'lignes', 'articlesSummary', 'nombreLignes',
             'montant', 'tauxCommission', 'commission',
             'methodePaiement', 'status', 'reference', 'notes',
             'createdAt', 'validatedAt',
@@ -63,5 +64,19 @@ class RecouvrementCreateSerializer(serializers.Serializer):
         return value
 
 
+class RecouvrementBatchItemSerializer(RecouvrementCreateSerializer):
+    clientId = serializers.UUIDField()
+
+
+class RecouvrementBatchSerializer(serializers.Serializer):
+    recouvrements = serializers.ListField(
+        child=serializers.DictField(), min_length=1, max_length=200,
+    )
+
+
 class StatusUpdateSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=['VALIDE', 'REJETE'])
+
+
+class BulkStatusUpdateSerializer(StatusUpdateSerializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), min_length=1, max_length=1000)
@@ -0,0 +1,90 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+
+from accounts.models import User
+from core.utils import filter_date_range
+from pdv.models import PointDeVente
+from recouvrements.models import Recouvrement
+
+_RECOUVREMENTS_SQL = """
+INSERT INTO recouvrements (
+    id, code, point_de_vente_id, agent_id, montant, taux_commission, commission,
+    methode_paiement, status, created_at, updated_at, resume_articles, nombre_lignes
+)
+SELECT
+    gen_random_uuid(), 'REC-T' || n, (%(pdvs)s::uuid[])[1 + n %% 20],
+    (%(agents)s::uuid[])[CASE WHEN n %% 200 = 0 THEN 1 ELSE 2 + n %% 9 END],
+    1000 + n %% 5000, 0.02, 20, 'ESPECES',
+    CASE WHEN n %% 100 = 1 THEN 'REJETE' WHEN n %% 10 < 3 THEN 'EN_ATTENTE' ELSE 'VALIDE' END,
+    timestamptz '2025-01-01' + n * interval '10 minutes', now(), '', 0
+FROM generate_series(1, %(total)s) AS n
+"""
+
+
+def _index_name(*fields):
+    return next(index.name for index in Recouvrement._meta.indexes if index.fields == list(fields))
+
+
+class DateRangeIndexTests(TestCase):
+    """The list filters read the composite ``(..., created_at)`` indexes, newest first.
+
+    The filtered agent and status are rare, as they are once the table is
+    large: scanning ``created_at`` alone and filtering would read most rows.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        agents = [
+            User.objects.create(nom=f'Agent {i}', telephone=f'07100000{i:02d}', role='agent')
+            for i in range(10)
+        ]
+        pdvs = [
+            PointDeVente.objects.create(
+                code=f'CAF-T{i}', nom=f'PDV {i}', commune='Cocody', proprietaire_nom='Proprietaire',
+                agent=agents[i % 10],
+            )
+            for i in range(20)
+        ]
+        cls.agent = agents[0]
+        with connection.cursor() as cursor:
+            cursor.execute(_RECOUVREMENTS_SQL, {
+                'pdvs': [str(p.pk) for p in pdvs],
+                'agents': [str(a.pk) for a in agents],
+                'total': 50000,
+            })
+            cursor.execute('ANALYZE recouvrements')
+
+    def page_plan(self, qs, params):
+        return filter_date_range(qs, params).order_by('-created_at')[:20].explain()
+
+    def assertIndexScan(self, plan, index):
+        self.assertIn('Index Scan', plan)
+        self.assertIn(index, plan)
+        self.assertNotIn('Seq Scan', plan)
+        self.assertNotIn('Sort', plan)
+
+    def test_agent_filter(self):
+        plan = self.page_plan(
+            Recouvrement.objects.filter(agent=self.agent),
+            {'startDate': '2025-03-01', 'endDate': '2025-06-30'},
+        )
+        self.assertIndexScan(plan, _index_name('agent', 'created_at', 'id'))
+
+    def test_status_filter(self):
+        plan = self.page_plan(
+            Recouvrement.objects.filter(status='REJETE'),
+            {'startDate': '2025-03-01', 'endDate': '2025-06-30'},
+        )
+        self.assertIndexScan(plan, _index_name('status', 'created_at'))
+
+    def test_date_range(self):
+        plan = self.page_plan(Recouvrement.objects.all(), {'startDate': '2025-03-01', 'endDate': '2025-03-31'})
+        self.assertIndexScan(plan, _index_name('created_at', 'id'))
+
+    def test_bounds_are_half_open_business_days(self):
+        qs = filter_date_range(Recouvrement.objects.all(), {'startDate': '2025-01-02', 'endDate': '2025-01-02'})
+        jours = {d.date() for d in qs.values_list('created_at', flat=True)}
+        self.assertEqual(jours, {date(2025, 1, 2)})
+        self.assertEqual(qs.count(), 24 * 6)
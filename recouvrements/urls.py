@@ -3,11 +3,17 @@ from django.urls import path
 from recouvrements.views import RecouvrementViewSet
 
 rec_list = RecouvrementViewSet.as_view({'get': 'list', 'post': 'create'})
+rec_batch = RecouvrementViewSet.as_view({'post': 'batch'})
+rec_bulk_status = RecouvrementViewSet.as_view({'post': 'bulk_status'})
+rec_export = RecouvrementViewSet.as_view({'get': 'export'})
 rec_detail = RecouvrementViewSet.as_view({'get': 'retrieve'})
 rec_status = RecouvrementViewSet.as_view({'patch': 'update_status'})
 
 urlpatterns = [
     path('recouvrements/', rec_list, name='recouvrement-list'),
+    path('recouvrements/batch/', rec_batch, name='recouvrement-batch'),
+    path('recouvrements/bulk-status/', rec_bulk_status, name='recouvrement-bulk-status'),
+    path('recouvrements/export/', rec_export, name='recouvrement-export'),
     path('recouvrements/<str:pk>/', rec_detail, name='recouvrement-detail'),
     path('recouvrements/<str:pk>/status/', rec_status, name='recouvrement-status'),
 ]
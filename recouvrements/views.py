@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from django.db.models import Q
+from django.db import connection, transaction
 from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import status
@@ -8,42 +8,152 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from core.cache import bump_data_version
 from core.exceptions import StatusConflictError
 from core.models import Settings
-from core.pagination import CAFPagination
+from core.pagination import CAFCursorPagination, CAFPagination
 from core.permissions import IsAdmin, IsAdminOrAgent, IsAgent
-from core.utils import generate_code
+from core.search import search
+from core.utils import filter_date_range, generate_code, generate_codes, parse_fields
+from accounts.models import User
 from pdv.models import PointDeVente
+from rapports import rollups
+from recouvrements import projections
+from recouvrements.export import EXPORT_FORMATS, stream_export
 from recouvrements.models import LigneRecouvrement, Recouvrement
 from recouvrements.serializers import (
+    BulkStatusUpdateSerializer,
+    RecouvrementBatchItemSerializer,
+    RecouvrementBatchSerializer,
     RecouvrementCreateSerializer,
     RecouvrementListSerializer,
     StatusUpdateSerializer,
 )
 
 
+def _pdv_error(pdv, agent):
+    """Error body when ``agent`` cannot record on ``pdv``, else None."""
+    if pdv is None:
+        return status.HTTP_404_NOT_FOUND, {'code': 'NOT_FOUND', 'message': 'Point de vente introuvable'}
+    if pdv.agent_id != agent.id:
+        return status.HTTP_403_FORBIDDEN, {'code': 'FORBIDDEN', 'message': 'Le point de vente ne vous est pas attribue'}
+    if pdv.status != 'ACTIF':
+        return status.HTTP_422_UNPROCESSABLE_ENTITY, {
+            'code': 'UNPROCESSABLE_ENTITY', 'message': "Le point de vente n'est pas actif",
+        }
+    return None
+
+
+def _build_recouvrement(data, pdv, agent, taux_decimal, code):
+    """Unsaved recouvrement and lignes for validated ``RecouvrementCreateSerializer`` data."""
+    lignes = []
+    montant_total = 0
+    for l in data['lignes']:
+        sous_total = l['prixUnitaire'] * l['quantite']
+        montant_total += sous_total
+        lignes.append(LigneRecouvrement(
+            nom_produit=l['nomProduit'],
+            categorie=l['categorie'],
+            prix_unitaire=l['prixUnitaire'],
+            quantite=l['quantite'],
+            sous_total=sous_total,
+        ))
+
+    rec = Recouvrement(
+        code=code,
+        point_de_vente=pdv,
+        agent=agent,
+        montant=montant_total,
+        taux_commission=taux_decimal,
+        commission=round(montant_total * float(taux_decimal)),
+        methode_paiement=data['methodePaiement'],
+        status='EN_ATTENTE',
+        reference=data.get('reference') or None,
+        notes=data.get('notes') or None,
+        client_id=data.get('clientId'),
+    )
+    rec.set_lignes_summary(lignes)
+    for ligne in lignes:
+        ligne.recouvrement = rec
+    return rec, lignes
+
+
+# Conditional update: rows already processed are left untouched and reported as conflicts.
+_BULK_STATUS_SQL = """
+UPDATE recouvrements
+SET status = %(status)s::text,
+    validated_at = CASE WHEN %(status)s::text = 'VALIDE' THEN %(now)s ELSE validated_at END,
+    updated_at = %(now)s
+WHERE id = ANY(%(ids)s::uuid[]) AND status = 'EN_ATTENTE'
+RETURNING id, created_at, agent_id, point_de_vente_id, methode_paiement, montant, commission
+"""
+
+
+def _first_message(errors):
+    if isinstance(errors, dict):
+        errors = list(errors.values())
+    if isinstance(errors, list):
+        return next((m for m in map(_first_message, errors) if m), None)
+    return str(errors)
+
+
+def _error_details(errors):
+    return [{'field': field, 'message': _first_message(messages)} for field, messages in errors.items()]
+
+
 @extend_schema_view(
     list=extend_schema(
         tags=['Recouvrements'], summary='Lister les recouvrements',
         parameters=[
-            OpenApiParameter('search', str, description='Recherche par code, PDV'),
+            OpenApiParameter('search', str, description='Recherche par code, PDV, agent (triee par pertinence sans sort)'),
             OpenApiParameter('status', str, description='Filtrer par statut (EN_ATTENTE/VALIDE/REJETE)'),
             OpenApiParameter('methodePaiement', str, description='Filtrer par methode (MTN_MOMO/ORANGE_MONEY/ESPECES)'),
             OpenApiParameter('agentId', str, description='Filtrer par agent'),
             OpenApiParameter('pointDeVenteId', str, description='Filtrer par PDV'),
             OpenApiParameter('startDate', str, description='Date debut (YYYY-MM-DD)'),
             OpenApiParameter('endDate', str, description='Date fin (YYYY-MM-DD)'),
+            OpenApiParameter('cursor', str, description='Pagination par curseur : vide pour la premiere page, puis nextCursor/prevCursor'),
+            OpenApiParameter('withTotal', bool, description='Avec cursor, calculer aussi le total (defaut false)'),
+            OpenApiParameter('fields', str, description='Champs a renvoyer, separes par des virgules (defaut : tous)'),
+            OpenApiParameter('expand', str, description='Relations a inclure avec fields (lignes)'),
+        ],
+    ),
+    export=extend_schema(
+        tags=['Recouvrements'], summary='Exporter les recouvrements (CSV/NDJSON)',
+        parameters=[
+            OpenApiParameter('exportFormat', str, description='Format (csv/ndjson, defaut csv)'),
+            OpenApiParameter('startDate', str, description='Date debut (YYYY-MM-DD)'),
+            OpenApiParameter('endDate', str, description='Date fin (YYYY-MM-DD)'),
+        ],
+        responses={(200, 'text/csv'): str, (200, 'application/x-ndjson'): str},
+    ),
+    retrieve=extend_schema(
+        tags=['Recouvrements'], summary='Detail recouvrement',
+        parameters=[
+            OpenApiParameter('fields', str, description='Champs a renvoyer, separes par des virgules (defaut : tous)'),
+            OpenApiParameter('expand', str, description='Relations a inclure avec fields (lignes)'),
         ],
     ),
-    retrieve=extend_schema(tags=['Recouvrements'], summary='Detail recouvrement'),
     create=extend_schema(tags=['Recouvrements'], summary='Creer un recouvrement', request=RecouvrementCreateSerializer, responses={201: RecouvrementListSerializer}),
+    batch=extend_schema(
+        tags=['Recouvrements'], summary='Soumettre un lot de recouvrements (synchronisation hors ligne)',
+        description='Chaque element porte un clientId genere sur l\'appareil. Renvoyer le meme clientId '
+                    'ne cree pas de doublon : l\'element est signale comme existant.',
+        request=RecouvrementBatchSerializer,
+    ),
+    bulk_status=extend_schema(
+        tags=['Recouvrements'], summary='Valider/Rejeter un lot de recouvrements',
+        description='Seuls les recouvrements EN_ATTENTE changent de statut ; les autres sont renvoyes '
+                    'dans conflits (deja traites), les ids inconnus dans introuvables.',
+        request=BulkStatusUpdateSerializer,
+    ),
     update_status=extend_schema(tags=['Recouvrements'], summary='Valider/Rejeter un recouvrement', request=StatusUpdateSerializer, responses={200: RecouvrementListSerializer}),
 )
 class RecouvrementViewSet(ViewSet):
     def get_permissions(self):
-        if self.action == 'create':
+        if self.action in ('create', 'batch'):
             return [IsAgent()]
-        if self.action == 'update_status':
+        if self.action in ('update_status', 'bulk_status'):
             return [IsAdmin()]
         return [IsAdminOrAgent()]
 
@@ -53,9 +163,7 @@ class RecouvrementViewSet(ViewSet):
             qs = qs.filter(agent_id=request.user.id)
         return qs
 
-    def list(self, request):
-        qs = self.get_queryset(request)
-
+    def filter_queryset(self, request, qs):
         rec_status = request.query_params.get('status')
         if rec_status:
             qs = qs.filter(status=rec_status)
@@ -76,22 +184,14 @@ class RecouvrementViewSet(ViewSet):
         if agent_id and request.user.role == 'admin':
             qs = qs.filter(agent_id=agent_id)
 
-        start_date = request.query_params.get('startDate')
-        if start_date:
-            qs = qs.filter(created_at__date__gte=start_date)
-
-        end_date = request.query_params.get('endDate')
-        if end_date:
-            qs = qs.filter(created_at__date__lte=end_date)
+        qs = filter_date_range(qs, request.query_params)
 
-        search = request.query_params.get('search')
-        if search:
-            qs = qs.filter(
-                Q(code__icontains=search)
-                | Q(point_de_vente__nom__icontains=search)
-                | Q(agent__nom__icontains=search)
-            )
+        term = request.query_params.get('search')
+        if term:
+            qs = search(qs, term, ['code', 'point_de_vente__nom', 'agent__nom'])
+        return qs
 
+    def get_ordering(self, request):
         sort_field = request.query_params.get('sort', 'createdAt')
         sort_order = request.query_params.get('order', 'desc')
 
@@ -104,85 +204,82 @@ class RecouvrementViewSet(ViewSet):
         db_field = sort_map.get(sort_field, 'created_at')
         if sort_order == 'desc':
             db_field = f'-{db_field}'
-        qs = qs.order_by(db_field)
+        return db_field
 
+    def get_fields(self, request):
+        return parse_fields(request.query_params, list(projections.FIELDS), projections.EXPANDABLE)
+
+    def list(self, request):
+        fields = self.get_fields(request)
+        qs = self.filter_queryset(request, self.get_queryset(request))
+
+        if 'cursor' in request.query_params:
+            ordering = self.get_ordering(request)
+            paginator = CAFCursorPagination()
+            page = paginator.paginate_queryset(
+                projections.list_values(qs, fields, extra=[ordering.lstrip('-')]), request, ordering,
+            )
+            return paginator.get_paginated_response(projections.represent(page, fields))
+
+        if request.query_params.get('search') and 'sort' not in request.query_params:
+            qs = qs.order_by('-pertinence', self.get_ordering(request))
+        else:
+            qs = qs.order_by(self.get_ordering(request))
         paginator = CAFPagination()
-        page = paginator.paginate_queryset(qs, request)
-        serializer = RecouvrementListSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        page = paginator.paginate_queryset(projections.list_values(qs, fields), request)
+        return paginator.get_paginated_response(projections.represent(page, fields))
+
+    def export(self, request):
+        export_format = request.query_params.get('exportFormat', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': {'code': 'VALIDATION_ERROR', 'message': 'exportFormat doit etre csv ou ndjson'}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        qs = self.filter_queryset(request, Recouvrement.objects.all())
+        if request.user.role == 'agent':
+            qs = qs.filter(agent_id=request.user.id)
+        return stream_export(qs, self.get_ordering(request), export_format)
 
     def retrieve(self, request, pk=None):
+        fields = self.get_fields(request)
         try:
-            rec = self.get_queryset(request).get(pk=pk)
-        except (Recouvrement.DoesNotExist, ValueError):
+            rows = list(projections.list_values(self.get_queryset(request).filter(pk=pk), fields))
+        except ValueError:
+            rows = []
+        if not rows:
             return Response(
                 {'error': {'code': 'NOT_FOUND', 'message': 'Recouvrement introuvable'}},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        return Response(RecouvrementListSerializer(rec).data)
+        return Response(projections.represent(rows, fields)[0])
 
     def create(self, request):
         serializer = RecouvrementCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        # Validate PDV
         try:
             pdv = PointDeVente.objects.get(pk=data['pointDeVenteId'])
         except PointDeVente.DoesNotExist:
-            return Response(
-                {'error': {'code': 'NOT_FOUND', 'message': 'Point de vente introuvable'}},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        if pdv.agent_id != request.user.id:
-            return Response(
-                {'error': {'code': 'FORBIDDEN', 'message': 'Le point de vente ne vous est pas attribue'}},
-                status=status.HTTP_403_FORBIDDEN,
-            )
+            pdv = None
+        error = _pdv_error(pdv, request.user)
+        if error:
+            error_status, body = error
+            return Response({'error': body}, status=error_status)
 
-        if pdv.status != 'ACTIF':
-            return Response(
-                {'error': {'code': 'UNPROCESSABLE_ENTITY', 'message': "Le point de vente n'est pas actif"}},
-                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            )
-
-        # Compute
         settings = Settings.get()
         taux_decimal = settings.taux_commission / Decimal('100')
-
-        lignes_data = data['lignes']
-        computed_lignes = []
-        montant_total = 0
-        for l in lignes_data:
-            sous_total = l['prixUnitaire'] * l['quantite']
-            montant_total += sous_total
-            computed_lignes.append({
-                'nom_produit': l['nomProduit'],
-                'categorie': l['categorie'],
-                'prix_unitaire': l['prixUnitaire'],
-                'quantite': l['quantite'],
-                'sous_total': sous_total,
-            })
-
-        commission = round(montant_total * float(taux_decimal))
         code = generate_code('REC', Recouvrement)
+        rec, lignes = _build_recouvrement(data, pdv, request.user, taux_decimal, code)
 
-        rec = Recouvrement.objects.create(
-            code=code,
-            point_de_vente=pdv,
-            agent=request.user,
-            montant=montant_total,
-            taux_commission=taux_decimal,
-            commission=commission,
-            methode_paiement=data['methodePaiement'],
-            status='EN_ATTENTE',
-            reference=data.get('reference') or None,
-            notes=data.get('notes') or None,
-        )
+        with transaction.atomic():
+            rec.save()
+            LigneRecouvrement.objects.bulk_create(lignes)
 
-        for cl in computed_lignes:
-            LigneRecouvrement.objects.create(recouvrement=rec, **cl)
+            rollups.record_created([rec])
+            rollups.record_lignes(lignes)
+            bump_data_version()
 
         rec = Recouvrement.objects.select_related(
             'point_de_vente', 'agent',
@@ -193,30 +290,146 @@ class RecouvrementViewSet(ViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        envelope = RecouvrementBatchSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+        items = envelope.validated_data['recouvrements']
+
+        resultats = [None] * len(items)
+        valides = {}  # index -> validated data
+        vus = set()
+        for i, item in enumerate(items):
+            serializer = RecouvrementBatchItemSerializer(data=item)
+            if not serializer.is_valid():
+                resultats[i] = {
+                    'clientId': item.get('clientId'), 'status': 'ERREUR',
+                    'error': {
+                        'code': 'VALIDATION_ERROR', 'message': 'Erreur de validation',
+                        'details': _error_details(serializer.errors),
+                    },
+                }
+                continue
+            client_id = serializer.validated_data['clientId']
+            if client_id in vus:
+                resultats[i] = {
+                    'clientId': str(client_id), 'status': 'ERREUR',
+                    'error': {'code': 'VALIDATION_ERROR', 'message': 'clientId en double dans le lot'},
+                }
+                continue
+            vus.add(client_id)
+            valides[i] = serializer.validated_data
+
+        pdvs = PointDeVente.objects.in_bulk({data['pointDeVenteId'] for data in valides.values()})
+        settings = Settings.get()
+        taux_decimal = settings.taux_commission / Decimal('100')
+
+        with transaction.atomic():
+            # Serialises concurrent replays of the same agent's queue.
+            User.objects.select_for_update().filter(pk=request.user.pk).exists()
+            existants = {
+                client_id: (rec_id, code)
+                for client_id, rec_id, code in Recouvrement.objects.filter(
+                    agent=request.user, client_id__in=[d['clientId'] for d in valides.values()],
+                ).values_list('client_id', 'id', 'code')
+            }
+
+            a_creer = []
+            for i, data in valides.items():
+                client_id = data['clientId']
+                if client_id in existants:
+                    rec_id, code = existants[client_id]
+                    resultats[i] = {'clientId': str(client_id), 'status': 'EXISTANT', 'id': str(rec_id), 'code': code}
+                    continue
+                error = _pdv_error(pdvs.get(data['pointDeVenteId']), request.user)
+                if error:
+                    resultats[i] = {'clientId': str(client_id), 'status': 'ERREUR', 'error': error[1]}
+                    continue
+                a_creer.append(i)
+
+            recs, lignes = [], []
+            for i, code in zip(a_creer, generate_codes('REC', Recouvrement, len(a_creer))):
+                data = valides[i]
+                rec, rec_lignes = _build_recouvrement(
+                    data, pdvs[data['pointDeVenteId']], request.user, taux_decimal, code,
+                )
+                recs.append(rec)
+                lignes.extend(rec_lignes)
+                resultats[i] = {'clientId': str(rec.client_id), 'status': 'CREE', 'id': str(rec.id), 'code': code}
+
+            if recs:
+                Recouvrement.objects.bulk_create(recs)
+                LigneRecouvrement.objects.bulk_create(lignes)
+                rollups.record_created(recs)
+                rollups.record_lignes(lignes)
+                bump_data_version()
+
+        totaux = {key: sum(1 for r in resultats if r['status'] == key) for key in ('CREE', 'EXISTANT', 'ERREUR')}
+        return Response({
+            'crees': totaux['CREE'],
+            'existants': totaux['EXISTANT'],
+            'erreurs': totaux['ERREUR'],
+            'resultats': resultats,
+        })
+
     @action(detail=True, methods=['patch'], url_path='status')
     def update_status(self, request, pk=None):
-        try:
-            rec = Recouvrement.objects.select_related(
-                'point_de_vente', 'agent',
-            ).prefetch_related('lignes').get(pk=pk)
-        except (Recouvrement.DoesNotExist, ValueError):
-            return Response(
-                {'error': {'code': 'NOT_FOUND', 'message': 'Recouvrement introuvable'}},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        with transaction.atomic():
+            try:
+                rec = Recouvrement.objects.select_for_update(of=('self',)).select_related(
+                    'point_de_vente', 'agent',
+                ).prefetch_related('lignes').get(pk=pk)
+            except (Recouvrement.DoesNotExist, ValueError):
+                return Response(
+                    {'error': {'code': 'NOT_FOUND', 'message': 'Recouvrement introuvable'}},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            if rec.status != 'EN_ATTENTE':
+                raise StatusConflictError()
+
+            serializer = StatusUpdateSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+            ancien_status = rec.status
+            new_status = serializer.validated_data['status']
+            rec.status = new_status
+
+            if new_status == 'VALIDE':
+                rec.validated_at = timezone.now()
+
+            rec.save()
+            rollups.record_status_change(rec, ancien_status)
+            bump_data_version()
 
-        if rec.status != 'EN_ATTENTE':
-            raise StatusConflictError()
+        return Response(RecouvrementListSerializer(rec).data)
 
-        serializer = StatusUpdateSerializer(data=request.data)
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        serializer = BulkStatusUpdateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-
         new_status = serializer.validated_data['status']
-        rec.status = new_status
-
-        if new_status == 'VALIDE':
-            rec.validated_at = timezone.now()
-
-        rec.save()
-
-        return Response(RecouvrementListSerializer(rec).data)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(_BULK_STATUS_SQL, {
+                    'status': new_status, 'now': timezone.now(), 'ids': [str(i) for i in ids],
+                })
+                columns = [col.name for col in cursor.description]
+                recs = [Recouvrement(status=new_status, **dict(zip(columns, row))) for row in cursor.fetchall()]
+
+            if recs:
+                rollups.record_status_changes(recs, 'EN_ATTENTE')
+                bump_data_version()
+
+        reussis = {rec.id for rec in recs}
+        restants = [i for i in ids if i not in reussis]
+        existants = set(Recouvrement.objects.filter(id__in=restants).values_list('id', flat=True))
+
+        return Response({
+            'status': new_status,
+            'reussis': [str(i) for i in ids if i in reussis],
+            'conflits': [str(i) for i in restants if i in existants],
+            'introuvables': [str(i) for i in restants if i not in existants],
+        })